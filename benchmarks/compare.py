@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compares two result files written by benchmarks/run.py.
+
+Usage::
+
+    $ python benchmarks/compare.py before.json after.json
+
+"""
+
+import sys
+import json
+
+# Metric -> whether higher is better
+METRICS = (('rps', True), ('p50_ms', False), ('p99_ms', False), ('min_ms', False))
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+
+    with open(sys.argv[1]) as f:
+        before = json.load(f)
+
+    with open(sys.argv[2]) as f:
+        after = json.load(f)
+
+    print('{0} -> {1}'.format(before['meta']['revision'], after['meta']['revision']))
+
+    for name in sorted(set(before['results']) & set(after['results'])):
+        old, new = before['results'][name], after['results'][name]
+        changes = []
+
+        for metric, higher_is_better in METRICS:
+            if metric in old and metric in new and old[metric]:
+                change = (new[metric] - old[metric]) / old[metric] * 100
+                better = change >= 0 if higher_is_better else change <= 0
+                changes.append('{0} {1:+.1f}%{2}'.format(metric, change, '' if better else ' (!)'))
+
+        print('{0:<55} {1}'.format(name, '  '.join(changes)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compares the JSON backends on the planes and pilots endpoints of the full example app.
+
+Usage::
+
+    $ python benchmarks/json_backends.py [--items 5000] [--requests 200]
+
+"""
+
+import os
+import sys
+import json
+import timeit
+import argparse
+
+from flask import Flask
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'examples', 'full')]
+
+from flask_journey import Journey  # noqa: E402
+from flask_journey.backends import BACKENDS  # noqa: E402
+from app.api.bundles import v1  # noqa: E402
+from app.fake_data import planes, pilots  # noqa: E402
+
+
+def populate(count):
+    planes.data[:] = [{'id': i, 'name': 'Plane {0}'.format(i), 'wings': 2 + i % 7} for i in range(count)]
+    pilots.data[:] = [{'id': i, 'name': 'Pilot {0}'.format(i)} for i in range(count)]
+
+
+def create_client(backend):
+    app = Flask(__name__)
+    Journey(app, bundles=[v1], json_backend=backend)
+    return app.test_client()
+
+
+def bench(client, requests):
+    body = json.dumps({'id': 1, 'name': 'x' * 1024, 'wings': 4})
+
+    cases = (
+        ('GET planes', lambda: client.get('/api/v1/planes?min_wings=2')),
+        ('GET pilots', lambda: client.get('/api/v1/pilots')),
+        ('PUT plane', lambda: client.put('/api/v1/planes/1', data=body, content_type='application/json')),
+    )
+
+    return dict((name, timeit.timeit(case, number=requests) / requests * 1000) for name, case in cases)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=5000, help='Number of planes and pilots')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+    args = parser.parse_args()
+
+    populate(args.items)
+
+    for backend in sorted(BACKENDS):
+        try:
+            client = create_client(backend)
+        except Exception as err:
+            print('{0:<8} skipped ({1})'.format(backend, err))
+            continue
+
+        results = bench(client, args.requests)
+        print('{0:<8} '.format(backend) + '  '.join('{0}: {1:.3f} ms'.format(k, v) for k, v in sorted(results.items())))
+
+
+if __name__ == '__main__':
+    main()
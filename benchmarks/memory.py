@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compares the memory taken by Journey route listings with the nested dicts they were stored as before,
+on the routes of a generated app, and measures what the app state retains after serving the route views.
+
+Usage::
+
+    $ python benchmarks/memory.py [--bundles 50] [--blueprints 20] [--rules 20]
+
+"""
+
+import os
+import sys
+import argparse
+import tracemalloc
+
+from flask import Flask, Blueprint
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from flask_journey import Journey, BlueprintBundle  # noqa: E402
+from flask_journey.rules import RuleIndex  # noqa: E402
+from flask_journey.records import BundleRecord, BlueprintRecord  # noqa: E402
+
+
+def make_journey(bundle_count, blueprint_count, rule_count):
+    journey = Journey()
+
+    for b in range(bundle_count):
+        bundle = BlueprintBundle('/api/b{0}'.format(b))
+
+        for p in range(blueprint_count):
+            bp = Blueprint('b{0}_bp{1}'.format(b, p), __name__)
+
+            for r in range(rule_count):
+                bp.add_url_rule('/r{0}/<item_id>'.format(r), 'r{0}'.format(r), lambda item_id: item_id,
+                                methods=['GET', 'PUT'] if r % 2 else ['GET'])
+
+            bundle.attach_bp(bp)
+
+        journey.attach_bundle(bundle)
+
+    return journey
+
+
+def dict_listings(app, registered):
+    """Route listings as built before records: a dict per bundle, blueprint and route, a list of methods per route"""
+
+    index = RuleIndex(app.url_map)
+    bundles = []
+
+    for bundle in registered:
+        blueprints = []
+
+        for blueprint in bundle.blueprints:
+            base_path = bundle.path + blueprint.path
+            routes = [{'path': rule.rule[len(base_path):], 'endpoint': rule.endpoint, 'methods': list(rule.methods)}
+                      for rule in index.rules(base_path, blueprint.name)]
+            blueprints.append({'name': blueprint.name, 'path': blueprint.path, 'import_name': blueprint.import_name,
+                               'description': blueprint.description, 'routes': routes})
+
+        bundles.append({'path': bundle.path, 'description': bundle.description, 'blueprints': blueprints})
+
+    return bundles
+
+
+def record_listings(app, registered):
+    """Route listings as records, with routes extracted as Journey does when registering bundles"""
+
+    index = RuleIndex(app.url_map)
+    bundles = []
+
+    for bundle in registered:
+        blueprints = []
+
+        for blueprint in bundle.blueprints:
+            routes = Journey._blueprint_records(app, bundle.path + blueprint.path, blueprint.name, index)
+            blueprints.append(BlueprintRecord(blueprint.name, blueprint.path, blueprint.import_name,
+                                              blueprint.description, tuple(routes)))
+
+        bundles.append(BundleRecord(bundle.path, bundle.description, tuple(blueprints)))
+
+    return tuple(bundles)
+
+
+def measure(build):
+    tracemalloc.start()
+
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bundles', type=int, default=50)
+    parser.add_argument('--blueprints', type=int, default=20)
+    parser.add_argument('--rules', type=int, default=20)
+    args = parser.parse_args()
+
+    journey = make_journey(args.bundles, args.blueprints, args.rules)
+    app = Flask(__name__)
+
+    # Registering blueprints allocates the URL map, which isn't part of the listings
+    journey.init_app(app)
+    registered = app.extensions['journey_state'].registered_bundles
+    routes = len(journey.routes_simple)
+
+    dicts, dicts_size = measure(lambda: dict_listings(app, registered))
+    records, records_size = measure(lambda: record_listings(app, registered))
+    del dicts, records
+
+    def read_views():
+        # Only what the app state keeps after the views were read counts, not the views themselves
+        len(journey.routes_json)
+        len(journey.routes_detailed)
+
+    with app.app_context():
+        views_size = measure(read_views)[1]
+
+    print('{0} routes'.format(routes))
+
+    for name, size in (('dicts', dicts_size), ('records', records_size), ('views', views_size),
+                       ('records+views', records_size + views_size)):
+        print('{0:<13} {1:>10.1f} KiB  {2:>6.1f} bytes/route'.format(name, size / 1024.0, size / float(routes)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compares path sanitation and joining with the previous regex-only normalizer, on the bundle and blueprint paths
+of a generated app.
+
+Usage::
+
+    $ python benchmarks/paths.py [--bundles 200] [--blueprints 100] [--repeat 5]
+
+"""
+
+import os
+import re
+import sys
+import timeit
+import argparse
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from flask_journey.paths import sanitize_path, join_paths  # noqa: E402
+
+
+def regex_sanitize(path):
+    """`sanitize_path` before memoization"""
+
+    if path == '/':
+        return path
+
+    if path[:1] != '/':
+        raise ValueError(path)
+
+    return re.sub(r'/+', '/', path).rstrip('/')
+
+
+def generate(bundle_count, blueprint_count):
+    """Returns (journey path, bundle path, blueprint path) triples, as registered by a generated app"""
+
+    return [('/api', '/tenant{0}/'.format(b), '/resource{0}'.format(p))
+            for b in range(bundle_count) for p in range(blueprint_count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bundles', type=int, default=200)
+    parser.add_argument('--blueprints', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5, help='Registrations per measurement (apps created)')
+    args = parser.parse_args()
+
+    triples = generate(args.bundles, args.blueprints)
+
+    def regex():
+        for _ in range(args.repeat):
+            for journey_path, bundle_path, child_path in triples:
+                regex_sanitize(journey_path + bundle_path)
+                regex_sanitize(journey_path + bundle_path + child_path)
+
+    def memoized():
+        for _ in range(args.repeat):
+            for journey_path, bundle_path, child_path in triples:
+                join_paths(journey_path, bundle_path)
+                join_paths(journey_path, bundle_path, child_path)
+
+    def canonical():
+        for _ in range(args.repeat):
+            for journey_path, bundle_path, child_path in triples:
+                sanitize_path(journey_path + child_path)
+
+    print('{0} paths x {1} registrations'.format(len(triples), args.repeat))
+
+    for name, func in (('regex', regex), ('memoized (cold)', memoized), ('memoized (warm)', memoized),
+                       ('canonical fast path', canonical)):
+        if name == 'memoized (cold)':
+            join_paths.cache_clear()
+            sanitize_path.cache_clear()
+
+        print('{0:<20} {1:.1f} ms'.format(name, timeit.timeit(func, number=1) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks the Journey request hot path and registration path, in-process with the Flask test client.
+
+Usage::
+
+    $ python benchmarks/run.py --output results.json [--quick] [--filter route]
+    $ python benchmarks/compare.py before.json after.json
+
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+
+from timeit import default_timer
+
+from flask import Flask, Blueprint
+from marshmallow import Schema, fields
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from flask_journey import Journey, BlueprintBundle, route  # noqa: E402
+
+
+class QuerySchema(Schema):
+    min_wings = fields.Integer(required=True)
+    name = fields.String()
+
+
+class PlaneSchema(Schema):
+    id = fields.Integer(required=True)
+    wings = fields.Integer(required=True)
+    name = fields.String(required=True)
+    description = fields.String()
+
+
+def make_planes(count, payload_size):
+    description = 'x' * payload_size
+    return [{'id': i, 'wings': 2 + i % 7, 'name': 'Plane {0}'.format(i), 'description': description}
+            for i in range(count)]
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))]
+
+
+def measure(request, requests, warmup=20):
+    """Times `requests` calls of `request`, returns throughput and latency percentiles"""
+
+    for _ in range(warmup):
+        request()
+
+    samples = []
+
+    for _ in range(requests):
+        start = default_timer()
+        request()
+        samples.append(default_timer() - start)
+
+    return {
+        'requests': requests,
+        'rps': requests / sum(samples),
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+    }
+
+
+def route_cases(list_lengths, payload_sizes):
+    """Yields (name, app factory, request function) for combinations of _query, _body and marshal_with"""
+
+    for payload_size in payload_sizes:
+        for length in list_lengths:
+            planes = make_planes(length, payload_size)
+
+            def create(planes=planes):
+                app = Flask(__name__)
+                bp = Blueprint('planes', __name__)
+
+                @route(bp, '/plain', methods=['GET'])
+                def plain():
+                    return 'ok'
+
+                @route(bp, '/query', methods=['GET'], _query=QuerySchema())
+                def query(_query):
+                    return 'ok'
+
+                @route(bp, '/many', methods=['GET'], _query=QuerySchema(), marshal_with=PlaneSchema(many=True))
+                def many(_query):
+                    return planes
+
+                @route(bp, '/stream', methods=['GET'], _query=QuerySchema(), marshal_with=PlaneSchema(many=True),
+                       stream=True)
+                def stream(_query):
+                    return planes
+
+                @route(bp, '/body', methods=['POST'], _body=PlaneSchema(many=True), marshal_with=PlaneSchema(many=True))
+                def body(_body):
+                    return _body.data
+
+                app.register_blueprint(bp)
+                return app
+
+            body = json.dumps(planes)
+            query_string = 'min_wings=2&name=plane'
+
+            yield 'route.plain', create, lambda c: c.get('/planes/plain')
+            yield 'route.query', create, lambda c: c.get('/planes/query?' + query_string)
+            yield ('route.query+marshal_with[n={0},size={1}]'.format(length, payload_size), create,
+                   lambda c: c.get('/planes/many?' + query_string))
+            yield ('route.query+marshal_with+stream[n={0},size={1}]'.format(length, payload_size), create,
+                   lambda c: c.get('/planes/stream?' + query_string))
+            yield ('route.body+marshal_with[n={0},size={1}]'.format(length, payload_size), create,
+                   lambda c, body=body: c.post('/planes/body', data=body, content_type='application/json'))
+
+
+def make_bundles(bundle_count, blueprint_count, rule_count, prefix):
+    bundles = []
+
+    for b in range(bundle_count):
+        bundle = BlueprintBundle('/{0}/b{1}'.format(prefix, b))
+
+        for p in range(blueprint_count):
+            bp = Blueprint('{0}_b{1}_bp{2}'.format(prefix, b, p), __name__)
+
+            for r in range(rule_count):
+                bp.add_url_rule('/r{0}/<item_id>'.format(r), 'r{0}'.format(r), lambda item_id: item_id)
+
+            bundle.attach_bp(bp)
+
+        bundles.append(bundle)
+
+    return bundles
+
+
+def bench_init_app(bundle_count, blueprint_count, rule_count, repeat):
+    """Times attaching and registering N bundles x M blueprints x K rules"""
+
+    samples = []
+
+    for i in range(repeat):
+        bundles = make_bundles(bundle_count, blueprint_count, rule_count, 'run{0}'.format(i))
+        app = Flask(__name__)
+
+        start = default_timer()
+        journey = Journey()
+
+        for bundle in bundles:
+            journey.attach_bundle(bundle)
+
+        journey.init_app(app)
+        samples.append(default_timer() - start)
+
+    return {
+        'repeat': repeat,
+        'routes': bundle_count * blueprint_count * rule_count,
+        'min_ms': min(samples) * 1000,
+        'p50_ms': percentile(samples, 50) * 1000,
+    }
+
+
+def bench_init_app_replay(bundle_count, blueprint_count, rule_count, repeat):
+    """Times initializing another app with a Journey whose plan an earlier app already compiled"""
+
+    journey = Journey()
+
+    for bundle in make_bundles(bundle_count, blueprint_count, rule_count, 'replay'):
+        journey.attach_bundle(bundle)
+
+    journey.init_app(Flask(__name__))
+    samples = []
+
+    for i in range(repeat):
+        app = Flask(__name__)
+
+        start = default_timer()
+        journey.init_app(app)
+        samples.append(default_timer() - start)
+
+    return {
+        'repeat': repeat,
+        'routes': bundle_count * blueprint_count * rule_count,
+        'min_ms': min(samples) * 1000,
+        'p50_ms': percentile(samples, 50) * 1000,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, stderr=subprocess.STDOUT).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--quick', action='store_true', help='Fewer requests and smaller apps, for smoke testing')
+    parser.add_argument('--filter', default='', help='Only run benchmarks whose name contains this string')
+    args = parser.parse_args()
+
+    if args.quick:
+        requests, list_lengths, payload_sizes = 50, (10, 100), (16, )
+        registration_sizes, repeat = ((10, 5, 5), (20, 10, 5)), 2
+    else:
+        requests, list_lengths, payload_sizes = 500, (1, 100, 1000), (16, 1024)
+        registration_sizes, repeat = ((10, 10, 10), (50, 10, 10), (100, 20, 10)), 5
+
+    results = {}
+    seen = set()
+
+    for name, create, request in route_cases(list_lengths, payload_sizes):
+        if name in seen or args.filter not in name:
+            continue
+
+        seen.add(name)
+        client = create().test_client()
+        results[name] = measure(lambda: request(client), requests)
+        print('{0:<55} {1[rps]:>9.1f} req/s  p50 {1[p50_ms]:.3f} ms  p99 {1[p99_ms]:.3f} ms'
+              .format(name, results[name]))
+
+    for n, m, k in registration_sizes:
+        name = 'init_app[bundles={0},blueprints={1},rules={2}]'.format(n, m, k)
+
+        if args.filter not in name:
+            continue
+
+        results[name] = bench_init_app(n, m, k, repeat)
+        print('{0:<55} {1[routes]:>9} routes min {1[min_ms]:.1f} ms  p50 {1[p50_ms]:.1f} ms'
+              .format(name, results[name]))
+
+    for n, m, k in registration_sizes:
+        name = 'init_app_replay[bundles={0},blueprints={1},rules={2}]'.format(n, m, k)
+
+        if args.filter not in name:
+            continue
+
+        results[name] = bench_init_app_replay(n, m, k, repeat)
+        print('{0:<55} {1[routes]:>9} routes min {1[min_ms]:.1f} ms  p50 {1[p50_ms]:.1f} ms'
+              .format(name, results[name]))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'meta': {
+                    'revision': git_revision(),
+                    'python': platform.python_version(),
+                    'timestamp': int(time.time()),
+                },
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, current_app
 from app.core import journey
 
 bp = Blueprint('routes', __name__)
@@ -8,5 +8,5 @@ bp = Blueprint('routes', __name__)
 
 @bp.route('/', methods=['GET'], strict_slashes=False)
 def get_many():
-    return jsonify(journey.routes_detailed)
+    return current_app.response_class(journey.routes_json, mimetype='application/json')
 
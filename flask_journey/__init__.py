@@ -13,10 +13,16 @@ __version__ = "0.1.4"
 from .exceptions import (
     IncompatibleBundle, InvalidPath, IncompatibleSchema,
     InvalidBlueprint, NoBundlesAttached, MissingBlueprints,
-    InvalidBundlesType, ConflictingPath
+    InvalidBundlesType, ConflictingPath, InvalidJSONBackend,
+    ConflictingBlueprint
 )
 
 from .journey import Journey
 from .blueprint_bundle import BlueprintBundle
 from .utils import route
+from .backends import JSONBackend
+from .bundles import create_metrics_bundle
 
+from .cache import CacheBackend, LocalCache
+from .response_cache import invalidate_cache
+from .compression import Compression
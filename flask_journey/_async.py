@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+from functools import partial
+from marshmallow import ValidationError
+
+from .backends import current_json_backend
+from .metrics import start_timer
+from .pool import submit_body_load, body_load_result
+from .parsers import stream_body_items
+
+
+async def _run(offload, func, *args):
+    """Calls `func`, in the event loop's default executor if `offload` is set"""
+
+    if not offload:
+        return func(*args)
+
+    return await asyncio.get_running_loop().run_in_executor(None, partial(func, *args))
+
+
+def wrap_async(f, steps, offload):
+    """Creates the `route` wrapper for a coroutine function view, see :func:`flask_journey.utils.route`.
+    Request data is read in the event loop, while decoding, validation and serialization optionally run
+    in the default executor so they don't block it.
+
+    :param f: Coroutine function view
+    :param steps: :class:`flask_journey.steps.RouteSteps` of the route
+    :param offload: Run schema work in the event loop's default executor
+    :return: Coroutine function
+    """
+
+    query, body = steps.query, steps.body
+
+    async def wrapper(*inner_args, **inner_kwargs):
+        timer = start_timer()
+
+        try:
+            if query is not None:
+                inner_kwargs['_query'] = await _run(offload, query.load, steps.query_data())
+                timer.mark('query')
+
+            if steps.stream_body:
+                inner_kwargs['_body'] = stream_body_items(body)
+                timer.mark('body')
+            elif body is not None:
+                raw = steps.body_bytes()
+
+                if steps.pooled(raw):
+                    outcome = await asyncio.wrap_future(submit_body_load(body, raw))
+                    inner_kwargs['_body'] = body_load_result(outcome)
+                else:
+                    json_data = await _run(offload, steps.body_data, current_json_backend(), raw)
+                    inner_kwargs['_body'] = await _run(offload, body.load, json_data)
+
+                timer.mark('body')
+
+        except ValidationError as err:
+            return steps.invalid(timer, err)
+
+        state, response = steps.before_view(timer, inner_kwargs)
+
+        if response is not None:
+            return response
+
+        try:
+            result = await f(*inner_args, **inner_kwargs)
+        except ValidationError as err:
+            if not steps.stream_body:
+                raise
+
+            return steps.invalid(timer, err)
+        finally:
+            # Also counts requests whose view raised
+            timer.finish()
+
+        timer.mark('handler')
+        result = steps.after_view(state, await _run(offload, steps.serialize, result))
+        timer.mark('serialize')
+
+        return result
+
+    return wrapper
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+import json
+import uuid
+import decimal
+
+from flask import current_app, jsonify, json as flask_json
+
+from .exceptions import InvalidJSONBackend
+
+
+def _default(obj):
+    """Encodes the non-JSON types marshmallow fields may output, the same way Flask does"""
+
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+
+    raise TypeError('Object of type {0} is not JSON serializable'.format(type(obj).__name__))
+
+
+class JSONBackend(object):
+    """Base class for JSON engines used by `route` to decode request bodies and encode responses"""
+
+    name = None
+
+    def loads(self, data):
+        """Decodes a JSON document
+
+        :param data: Raw request bytes
+        :return: Decoded object
+        :raises:
+            - ValueError if the document is invalid
+        """
+
+        raise NotImplementedError
+
+    def dumps(self, obj):
+        """Encodes an object as JSON
+
+        :param obj: Object to encode
+        :return: bytes or text
+        """
+
+        raise NotImplementedError
+
+
+class FlaskBackend(JSONBackend):
+    """Delegates to the app's JSON provider, keeping its `default` handling, key sorting, mimetype and pretty
+    printing in debug mode. Falls back to the standard library outside of app contexts, e.g. in body pool
+    processes."""
+
+    name = 'flask'
+
+    def loads(self, data):
+        return flask_json.loads(data)
+
+    def dumps(self, obj):
+        return flask_json.dumps(obj)
+
+    def response(self, data):
+        return jsonify(data)
+
+
+class StdlibBackend(JSONBackend):
+    name = 'json'
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(',', ':'), default=_default)
+
+
+class OrjsonBackend(JSONBackend):
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def __reduce__(self):
+        # Modules can't be pickled, re-import in the unpickling process instead
+        return type(self), ()
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+    def dumps(self, obj):
+        return self._orjson.dumps(obj, default=_default)
+
+
+class UjsonBackend(JSONBackend):
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def __reduce__(self):
+        return type(self), ()
+
+    def loads(self, data):
+        return self._ujson.loads(data)
+
+    def dumps(self, obj):
+        return self._ujson.dumps(obj, ensure_ascii=False, default=_default)
+
+
+BACKENDS = {
+    'flask': FlaskBackend,
+    'json': StdlibBackend,
+    'orjson': OrjsonBackend,
+    'ujson': UjsonBackend,
+}
+
+default_backend = FlaskBackend()
+
+
+def get_json_backend(backend=None):
+    """Returns a JSON backend instance
+
+    :param backend: :class:`JSONBackend` instance, name of a backend (flask, json, orjson, ujson), `auto` for the
+        fastest one installed, or None for the app's JSON provider
+    :return: :class:`JSONBackend` instance
+    :raises:
+        - InvalidJSONBackend if the backend is unknown or its package isn't installed
+    """
+
+    if backend is None or backend == 'flask':
+        return default_backend
+    elif isinstance(backend, JSONBackend):
+        return backend
+    elif backend == 'auto':
+        for name in ('orjson', 'ujson'):
+            try:
+                return BACKENDS[name]()
+            except ImportError:
+                continue
+
+        return default_backend
+    elif backend not in BACKENDS:
+        raise InvalidJSONBackend('Unknown JSON backend {0}, expected one of: {1}'
+                                 .format(backend, ', '.join(sorted(BACKENDS))))
+
+    try:
+        return BACKENDS[backend]()
+    except ImportError:
+        raise InvalidJSONBackend('JSON backend {0} requires the {0} package to be installed'.format(backend))
+
+
+def current_json_backend():
+    """Returns the JSON backend Journey was initialized with for the current app
+
+    :return: :class:`JSONBackend` instance
+    """
+
+    journey = current_app.extensions.get('journey')
+
+    if journey is None:
+        return default_backend
+
+    return journey.json_backend
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+import re
+import threading
+
+from flask import Blueprint, current_app, request
+from marshmallow import Schema, fields, validate
+from werkzeug.test import EnvironBuilder
+
+from .backends import current_json_backend
+from .responses import json_response, encoded_json_response
+from .utils import route
+
+BATCH_PATH = '/_batch'
+
+METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS')
+
+# Headers describing the batch request's own body, not the sub-requests', and Accept-Encoding as sub-request
+# bodies are embedded in the batch response uncompressed
+_skip_headers = frozenset(['content-length', 'content-type', 'transfer-encoding', 'accept-encoding'])
+
+
+class SubRequestSchema(Schema):
+    method = fields.String(missing='GET', validate=validate.OneOf(METHODS))
+    path = fields.String(required=True, validate=validate.Regexp(r'^/'))
+    query = fields.Dict(missing=dict)
+    headers = fields.Dict(missing=dict)
+    body = fields.Raw(missing=None, allow_none=True)
+
+
+def batch_blueprint_name(bundle_path):
+    """Returns the name of the batch blueprint of a bundle, unique per bundle path
+
+    :param bundle_path: Bundle path
+    :return: str
+    """
+
+    suffix = re.sub(r'[^0-9A-Za-z]+', '_', bundle_path).strip('_')
+    return 'journey_batch_' + suffix if suffix else 'journey_batch'
+
+
+def _is_safe_path(path):
+    """Checks that a sub-request path can't escape the bundle or recurse into the batch endpoint"""
+
+    segments = path.split('/')
+    return '.' not in segments and '..' not in segments and path.rstrip('/') != BATCH_PATH
+
+
+def _dispatch(app, dumps, prefix, headers, sub_request):
+    """Dispatches a sub-request through the app in its own request context
+
+    :param app: Flask app
+    :param dumps: JSON encoding function
+    :param prefix: Full path of the bundle, without trailing slash
+    :param headers: Headers of the batch request, inherited by the sub-request
+    :param sub_request: Loaded :class:`SubRequestSchema` data
+    :return: Tuple of status code, headers and encoded JSON body
+    """
+
+    path = sub_request['path']
+
+    if not _is_safe_path(path):
+        return 400, {}, dumps({'message': 'Invalid sub-request path {0}'.format(path)})
+
+    headers = dict(headers)
+    headers.update((k, v) for k, v in sub_request['headers'].items() if k.lower() not in _skip_headers)
+
+    builder = EnvironBuilder(
+        path=prefix + path,
+        method=sub_request['method'],
+        query_string=sub_request['query'],
+        headers=headers,
+        json=sub_request['body'],
+    )
+
+    try:
+        with app.request_context(builder.get_environ()):
+            response = app.full_dispatch_request()
+
+            # Read the body while the sub-request context is active, streamed responses need it
+            data = response.get_data()
+            response.close()
+    except Exception:
+        app.logger.exception('Batch sub-request to {0} failed'.format(path))
+        return 500, {}, dumps({'message': 'Internal Server Error'})
+    finally:
+        builder.close()
+
+    response_headers = dict((k, v) for k, v in response.headers.items() if k.lower() != 'content-length')
+
+    if not data:
+        body = b'null'
+    elif response.is_json:
+        # Splice the encoded body in as is instead of decoding and re-encoding it
+        body = data
+    else:
+        body = dumps(data.decode('utf-8', 'replace'))
+
+    return response.status_code, response_headers, body
+
+
+def _to_bytes(data):
+    return data.encode('utf-8') if not isinstance(data, bytes) else data
+
+
+def create_batch_blueprint(bundle_path, workers=None, limit=50):
+    """Creates the blueprint serving `POST {bundle path}/_batch`.
+
+    The endpoint takes a JSON array of sub-requests, each an object with `path` (relative to the bundle),
+    and optionally `method`, `query`, `headers` and `body`. Sub-requests are dispatched in-process through
+    the app, inheriting the batch request's headers, and answered with an array of `status`, `headers` and
+    `body` objects in the same order.
+
+    :param bundle_path: Bundle path, used to name the blueprint
+    :param workers: Run up to this many sub-requests concurrently in a thread pool, sequentially if None.
+        Only enable for bundles whose sub-requests don't depend on each other
+    :param limit: Maximum number of sub-requests per batch
+    :return: :class:`flask.Blueprint` object
+    """
+
+    bp = Blueprint(batch_blueprint_name(bundle_path), __name__, url_prefix=BATCH_PATH)
+    executor = []
+    executor_lock = threading.Lock()
+
+    def get_executor():
+        with executor_lock:
+            if not executor:
+                from concurrent.futures import ThreadPoolExecutor
+                executor.append(ThreadPoolExecutor(max_workers=workers))
+
+        return executor[0]
+
+    @route(bp, '/', methods=['POST'], _body=SubRequestSchema(many=True))
+    def batch(_body):
+        sub_requests = _body.data
+
+        if len(sub_requests) > limit:
+            return json_response({'_schema': ['At most {0} sub-requests per batch'.format(limit)]}, 422)
+
+        app = current_app._get_current_object()
+        dumps = current_json_backend().dumps
+        prefix = request.path.rstrip('/')[:-len(BATCH_PATH)]
+        headers = [(k, v) for k, v in request.headers.items() if k.lower() not in _skip_headers]
+
+        if workers and len(sub_requests) > 1:
+            results = list(get_executor().map(lambda sub: _dispatch(app, dumps, prefix, headers, sub), sub_requests))
+        else:
+            results = [_dispatch(app, dumps, prefix, headers, sub) for sub in sub_requests]
+
+        parts = []
+
+        for status, response_headers, body in results:
+            parts.append(b''.join([
+                b'{"status":', str(status).encode('ascii'),
+                b',"headers":', _to_bytes(dumps(response_headers)),
+                b',"body":', _to_bytes(body), b'}',
+            ]))
+
+        return encoded_json_response(b'[' + b','.join(parts) + b']')
+
+    return bp
@@ -1,21 +1,32 @@
 # -*- coding: utf-8 -*-
 
 from flask import Blueprint
+from werkzeug.utils import import_string
 
-from .utils import sanitize_path
-from .exceptions import InvalidBlueprint
+from .paths import sanitize_path
+from .registry import BlueprintRegistry
+from .exceptions import InvalidBlueprint, IncompatibleBundle, ConflictingPath, MissingBlueprints
 
 
 class BlueprintBundle(object):
     """Creates a BlueprintBundle at the path specified
 
     :param path: blueprint base path
+    :param description: Optional description string
+    :param batch: Mount a batch endpoint at `{path}/_batch`, dispatching multiple requests to the bundle's
+        routes in one, see :func:`flask_journey.batch.create_batch_blueprint`
+    :param batch_workers: Number of sub-requests of a batch to run concurrently, sequentially if None
+    :param compress: Compress responses of the bundle's routes, True for the default settings or a
+        :class:`flask_journey.compression.Compression` object
     """
 
-    def __init__(self, path='/', description=''):
+    def __init__(self, path='/', description='', batch=False, batch_workers=None, compress=None):
         self.path = sanitize_path(path)
         self.description = description
-        self.blueprints = []
+        self.batch = batch
+        self.batch_workers = batch_workers
+        self.compress = compress
+        self.blueprints = BlueprintRegistry()
 
     def attach_bp(self, bp, description=''):
         """Attaches a flask.Blueprint to the bundle
@@ -24,9 +35,55 @@ class BlueprintBundle(object):
         :param description: Optional description string
         :raises:
             - InvalidBlueprint if the Blueprint is not of type `flask.Blueprint`
+            - ConflictingBlueprint if a blueprint with the same name is already attached
         """
 
         if not isinstance(bp, Blueprint):
             raise InvalidBlueprint('Blueprints attached to the bundle must be of type {0}'.format(Blueprint))
 
-        self.blueprints.append((bp, description))
+        self.blueprints.add(bp.name, (bp, description))
+
+    def detach_bp(self, name):
+        """Detaches a blueprint from the bundle
+
+        :param name: Name of the blueprint
+        :return: The detached :class:`flask.Blueprint` object
+        :raises:
+            - KeyError if no blueprint with that name is attached
+        """
+
+        return self.blueprints.remove(name)[0]
+
+
+class DeferredBundle(object):
+    """Placeholder for a BlueprintBundle that is imported by dotted path when it gets registered
+
+    :param path: Path the imported bundle is expected to have
+    :param import_name: Import path of the bundle, e.g. `app.api.bundles:v1`
+    """
+
+    def __init__(self, path, import_name):
+        self.path = sanitize_path(path)
+        self.import_name = import_name
+
+    def load(self):
+        """Imports the bundle
+
+        :return: :class:`BlueprintBundle` object
+        :raises:
+            - IncompatibleBundle if the imported object is not of type `BlueprintBundle`
+            - ConflictingPath if the imported bundle's path differs from the one it was attached with
+            - MissingBlueprints if the bundle doesn't contain any blueprints
+        """
+
+        bundle = import_string(self.import_name)
+
+        if not isinstance(bundle, BlueprintBundle):
+            raise IncompatibleBundle('{0} must be of type {1}'.format(self.import_name, BlueprintBundle))
+        elif bundle.path != self.path:
+            raise ConflictingPath('{0} was attached at {1}, but its path is {2}'
+                                  .format(self.import_name, self.path, bundle.path))
+        elif len(bundle.blueprints) == 0:
+            raise MissingBlueprints("Bundles must contain at least one flask.Blueprint")
+
+        return bundle
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+from flask import Blueprint, current_app
+
+from .blueprint_bundle import BlueprintBundle
+
+
+def create_metrics_bundle(journey, path='/_journey'):
+    """Creates a bundle exposing the route metrics of `journey` in the Prometheus text format at `{path}/metrics`
+
+    :param journey: :class:`flask_journey.Journey` object created with `metrics=True`
+    :param path: Bundle path
+    :return: :class:`flask_journey.BlueprintBundle` object
+    """
+
+    bp = Blueprint('journey_metrics', __name__, url_prefix='/metrics')
+
+    @bp.route('/', methods=['GET'], strict_slashes=False)
+    def prometheus():
+        return current_app.response_class(journey.metrics.prometheus(),
+                                          mimetype='text/plain; version=0.0.4')
+
+    bundle = BlueprintBundle(path=path, description='Journey internals')
+    bundle.attach_bp(bp, description='Prometheus metrics')
+
+    return bundle
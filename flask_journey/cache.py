@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache(object):
+    """Thread-safe mapping that keeps the `maxsize` most recently used entries
+
+    :param maxsize: Maximum number of entries to keep
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """Returns the value stored at `key` and marks it as most recently used
+
+        :param key: Cache key
+        :param default: Returned if the key is not in the cache
+        :return: Cached value or default
+        """
+
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+
+            self._data[key] = value
+            return value
+
+    def set(self, key, value):
+        """Stores `value` at `key`, evicting the least recently used entry if the cache is full
+
+        :param key: Cache key
+        :param value: Value to store
+        """
+
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Removes `key` from the cache, if present
+
+        :param key: Cache key
+        """
+
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Removes all entries"""
+
+        with self._lock:
+            self._data.clear()
+
+
+class CacheBackend(object):
+    """Interface for stores used by `route` to cache encoded responses, implement it to share a cache between
+    processes (Redis, memcached...). Values are bytes or text, keys are short strings.
+    """
+
+    def get(self, key):
+        """Returns the value stored at `key`
+
+        :param key: Cache key
+        :return: Stored value, or None if missing or expired
+        """
+
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        """Stores `value` at `key`
+
+        :param key: Cache key
+        :param value: Value to store
+        :param ttl: Seconds until the value expires, 0 to never expire, None for the backend's default
+        """
+
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Removes `key` from the cache, if present
+
+        :param key: Cache key
+        """
+
+        raise NotImplementedError
+
+    def clear(self):
+        """Removes all entries"""
+
+        raise NotImplementedError
+
+
+class LocalCache(CacheBackend):
+    """In-process :class:`CacheBackend` keeping the `maxsize` most recently used entries
+
+    :param maxsize: Maximum number of entries to keep
+    :param ttl: Default number of seconds entries are kept, 0 or None to keep them until evicted
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.ttl = ttl
+        self._entries = LRUCache(maxsize)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        expires, value = entry
+
+        if expires is not None and expires <= time.time():
+            self._entries.delete(key)
+            return None
+
+        return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        self._entries.set(key, (time.time() + ttl if ttl else None, value))
+
+    def delete(self, key):
+        self._entries.delete(key)
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+try:
+    import click
+    from flask import current_app
+    from flask.cli import AppGroup
+except ImportError:  # Flask < 0.11
+    cli = None
+else:
+    cli = AppGroup('journey', help='Flask-Journey commands.')
+
+    @cli.command('startup-report')
+    def startup_report():
+        """Print startup timings per bundle and blueprint as JSON."""
+
+        report = current_app.extensions['journey'].startup_report
+
+        if report is None:
+            raise click.ClickException('Startup profiling is disabled, create Journey with profile=True')
+
+        click.echo(json.dumps(report, indent=2))
+
+    @cli.command('snapshot')
+    @click.argument('filename', required=False)
+    def snapshot(filename):
+        """Write the registered routes to a snapshot file, for workers to load with init_app(snapshot=...)."""
+
+        journey = current_app.extensions['journey']
+
+        try:
+            key = journey.write_snapshot(filename)
+        except ValueError as err:
+            raise click.ClickException(str(err))
+
+        click.echo('Wrote snapshot {0} to {1}'.format(key, filename or journey.snapshot_path))
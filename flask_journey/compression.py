@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Compression(object):
+    """Response compression settings, negotiated with the client's `Accept-Encoding`
+
+    :param level: gzip compression level (1-9)
+    :param brotli_level: Brotli quality (0-11)
+    :param min_size: Don't compress responses smaller than this many bytes
+    :param algorithms: Content codings to offer, in order of preference. Brotli (br) is skipped if the
+        brotli package isn't installed
+    """
+
+    def __init__(self, level=6, brotli_level=5, min_size=1024, algorithms=('br', 'gzip')):
+        self.level = level
+        self.brotli_level = brotli_level
+        self.min_size = min_size
+        self.algorithms = tuple(a for a in algorithms if a == 'gzip' or (a == 'br' and brotli is not None))
+
+    def negotiate(self, accept_encodings):
+        """Picks the content coding to use
+
+        :param accept_encodings: :class:`werkzeug.datastructures.Accept` of the request's `Accept-Encoding`
+        :return: Content coding, or None if the client accepts none of the offered ones
+        """
+
+        best, best_quality = None, 0
+
+        for algorithm in self.algorithms:
+            quality = accept_encodings.quality(algorithm)
+
+            if quality > best_quality:
+                best, best_quality = algorithm, quality
+
+        return best
+
+    def compress(self, algorithm, data):
+        """Compresses data
+
+        :param algorithm: Content coding returned by :meth:`negotiate`
+        :param data: bytes
+        :return: bytes
+        """
+
+        if algorithm == 'br':
+            return brotli.compress(data, quality=self.brotli_level)
+
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+
+def get_compression(compress):
+    """Returns the compression settings for a `compress` option
+
+    :param compress: :class:`Compression` object, True for the default settings, or None / False
+    :return: :class:`Compression` object or None
+    """
+
+    if compress is True:
+        return Compression()
+
+    return compress or None
+
+
+def _weaken_etag(response):
+    # The compressed body is a different byte sequence of the same representation
+    etag, weak = response.get_etag()
+
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def compress_response(response, compression, cache=None, cache_key=None, ttl=None):
+    """Compresses a response with the content coding negotiated with the current request's client.
+    Streamed, already encoded, non-200 and small responses are left as is.
+
+    Strong `ETag` validators get weakened whenever a content coding was negotiated, whether the body ends up
+    compressed or not, so 304 responses, which have no body to go by, carry the same validator as the 200.
+
+    :param response: :class:`flask.Response` object
+    :param compression: :class:`Compression` object
+    :param cache: :class:`flask_journey.response_cache.ResponseCache` the uncompressed body is cached in, to
+        look up and store the compressed body in alongside it
+    :param cache_key: Cache key of the uncompressed body
+    :param ttl: Seconds the compressed body is cached
+    :return: :class:`flask.Response` object
+    """
+
+    response.vary.add('Accept-Encoding')
+
+    if response.status_code == 304:
+        if compression.negotiate(request.accept_encodings) is not None:
+            _weaken_etag(response)
+
+        return response
+
+    if response.status_code != 200 or response.is_streamed or response.direct_passthrough or \
+            'Content-Encoding' in response.headers:
+        return response
+
+    algorithm = compression.negotiate(request.accept_encodings)
+
+    if algorithm is None:
+        return response
+
+    _weaken_etag(response)
+    data = response.get_data()
+
+    if len(data) < compression.min_size:
+        return response
+
+    body = None
+
+    if cache is not None:
+        variant_key = cache_key + ':' + algorithm
+        body = cache.get(variant_key)
+
+    if body is None:
+        body = compression.compress(algorithm, data)
+
+        if cache is not None:
+            cache.set(variant_key, body, ttl)
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = algorithm
+
+    return response
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+
+from flask import current_app, request
+
+from .responses import encoded_json_response
+
+
+def content_etag(data):
+    """Returns an entity tag for encoded output
+
+    :param data: JSON bytes or text
+    :return: str
+    """
+
+    if not isinstance(data, bytes):
+        data = data.encode('utf-8')
+
+    return hashlib.sha1(data).hexdigest()
+
+
+def is_not_modified(etag):
+    """Checks whether the client's copy, per the current request's `If-None-Match` header, is still current
+
+    :param etag: Entity tag of the current representation
+    :return: bool
+    """
+
+    return request.if_none_match.contains_weak(etag)
+
+
+def not_modified_response(etag):
+    """Creates an empty 304 response
+
+    :param etag: Entity tag of the current representation
+    :return: :class:`flask.Response` object
+    """
+
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+
+    return response
+
+
+def conditional_json_response(data, etag=None):
+    """Creates a response from already encoded JSON with an `ETag` header, or a 304 if the client's copy matches
+
+    :param data: JSON bytes or text
+    :param etag: Entity tag, a hash of `data` if not passed
+    :return: :class:`flask.Response` object
+    """
+
+    if etag is None:
+        etag = content_etag(data)
+
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+
+    response = encoded_json_response(data)
+    response.set_etag(etag)
+
+    return response
@@ -33,3 +33,9 @@ class MissingBlueprints(Exception):
     pass
 
 
+class InvalidJSONBackend(Exception):
+    pass
+
+
+class ConflictingBlueprint(Exception):
+    pass
@@ -1,32 +1,90 @@
 # -*- coding: utf-8 -*-
 
-from .utils import sanitize_path
+from flask import request, current_app, has_app_context
+
+from .paths import sanitize_path
+from .backends import get_json_backend
+from .rules import RuleIndex, rules_by_blueprint
+from .lazy import LazyRegistrationMiddleware
+from .profiling import StartupProfiler, NullProfiler
+from .metrics import RouteMetrics
+from .cache import LocalCache
+from .response_cache import ResponseCache
+from .schema_registry import SchemaRegistry
+from .lookup import PathIndex
+from .registry import BundleRegistry
+from .plan import RegistrationPlan, AppState, STATE_KEY
+from .snapshot import write_snapshot, snapshot_matches
+from .records import RouteRecord
+from .cli import cli
+from .compression import compress_response
 
 from .exceptions import (
     IncompatibleBundle, NoBundlesAttached,
     MissingBlueprints, InvalidBundlesType, ConflictingPath
 )
 
-from .blueprint_bundle import BlueprintBundle
+from .blueprint_bundle import BlueprintBundle, DeferredBundle
 
 
 class Journey(object):
     """Central controller class.
     Exposes an API for managing blueprints and listing routes
 
+    One Journey can be initialized on any number of apps, e.g. by an app factory. Attached bundles are compiled
+    once into a :class:`flask_journey.plan.RegistrationPlan` which gets replayed into each app, while registered
+    bundles and route listings are kept per app. Route listings refer to the current app, or the app Journey was
+    last initialized on outside of app contexts.
+
     :param app: App to pass directly to Journey
+    :param bundles: List of bundles to attach, if passing the app directly
+    :param json_backend: JSON engine used by routes for decoding request bodies and encoding responses, the app's
+        JSON provider if not passed, see :func:`flask_journey.backends.get_json_backend`
+    :param lazy: Defer importing and registering bundles until the app's first request, or :meth:`warm_up`
+    :param profile: Record startup timings, see :attr:`startup_report`
+    :param metrics: Collect per-endpoint request metrics in `route`, see :class:`flask_journey.metrics.RouteMetrics`
+    :param body_pool: :class:`concurrent.futures.Executor` for routes offloading large bodies with
+        `body_pool_threshold`, a shared process pool is created on first use if not passed
+    :param cache: :class:`flask_journey.cache.CacheBackend` for routes caching their responses, an in-process
+        :class:`flask_journey.cache.LocalCache` per app if not passed. Apps sharing a backend keep their entries
+        apart by :func:`flask_journey.response_cache.cache_namespace`
+    :param sample_schemas: Run an empty load and dump through each route schema when its blueprint gets
+        registered, see :attr:`schemas`
     :raises:
         - InvalidBundlesType if passed bundles is not of type list
+        - InvalidJSONBackend if the JSON backend is unknown or not installed
     """
 
-    def __init__(self, app=None, bundles=None):
+    def __init__(self, app=None, bundles=None, json_backend=None, lazy=False, profile=False, metrics=False,
+                 body_pool=None, cache=None, sample_schemas=False):
         self._app = None
-        self._registered_bundles = []
-        self._attached_bundles = []
+        self.json_backend = get_json_backend(json_backend)
+        self.lazy = lazy
+        self.metrics = RouteMetrics() if metrics else None
+        self.body_pool = body_pool
+        self.cache = cache
+        self.schemas = SchemaRegistry(sample=sample_schemas)
+        self._profiler = StartupProfiler() if profile else NullProfiler()
+        self._attached_bundles = BundleRegistry()
         self._internal_bundle = None
 
+        # Attached bundles compiled for registration, rebuilt after bundles get attached or detached
+        self._plan = None
+
+        # State of the app Journey was last initialized on, for accessing route listings outside of app contexts
+        self._last_state = AppState()
+
+        # Compression settings of compressed bundles' blueprints, keyed by blueprint name
+        self._compression = {}
+
+        # Path -> bundle, blueprint and endpoint lookup, extended as bundles get registered
+        self._path_index = PathIndex()
+
         self._journey_path = ''
 
+        # Route snapshot file passed to init_app, default target of `write_snapshot`
+        self.snapshot_path = None
+
         if app is not None:
             if not isinstance(bundles, list):
                 raise InvalidBundlesType('Bundles passed directly to Journey must be contained in a list')
@@ -35,43 +93,285 @@ class Journey(object):
 
             self.init_app(app)
 
-    def init_app(self, app):
+    def init_app(self, app, json_backend=None, lazy=None, snapshot=None):
         """Initializes Journey extension
 
         :param app: App passed from constructor or directly to init_app
+        :param json_backend: Overrides the JSON backend passed to the constructor
+        :param lazy: Overrides the lazy setting passed to the constructor
+        :param snapshot: Path of a route snapshot written by :meth:`write_snapshot`, e.g. with
+            `flask journey snapshot`. Routes are read from it instead of the URL map if it was written for the
+            same bundle definitions, otherwise it's ignored
         :raises:
             - NoBundlesAttached if no bundles has been attached attached
+            - InvalidJSONBackend if the JSON backend is unknown or not installed
 
         """
 
         if len(self._attached_bundles) == 0:
             raise NoBundlesAttached("At least one bundle must be attached before initializing Journey")
 
-        for bundle in self._attached_bundles:
-            processed_bundle = {
-                'path': bundle.path,
-                'description': bundle.description,
-                'blueprints': []
-            }
+        if json_backend is not None:
+            self.json_backend = get_json_backend(json_backend)
+
+        if lazy is not None:
+            self.lazy = lazy
+
+        state = AppState(self.plan, ResponseCache(self.cache if self.cache is not None else LocalCache()))
+        app.extensions['journey'] = self
+        app.extensions[STATE_KEY] = state
+        self._last_state = state
+
+        if snapshot is not None:
+            self.snapshot_path = snapshot
 
-            for (bp, description) in bundle.blueprints:
-                # Register the BP
-                blueprint = self._register_blueprint(app, bp, bundle.path,
-                                                     self.get_bp_path(bp), description)
+            with self._profiler.measure('load_snapshot'):
+                state.plan.load_snapshot(snapshot, self.json_backend.loads)
 
-                # Finally, attach the blueprints to its parent
-                processed_bundle['blueprints'].append(blueprint)
+        if cli is not None and 'journey' not in app.cli.commands:
+            app.cli.add_command(cli)
 
-            self._registered_bundles.append(processed_bundle)
+        app.after_request(self._compress_response)
+
+        if self.lazy:
+            state.pending_bundles.extend(state.plan.paths)
+            app.wsgi_app = LazyRegistrationMiddleware(app.wsgi_app, app, self)
+        else:
+            self._register_bundles(app, state.plan.paths)
+
+    @property
+    def plan(self):
+        """Returns the attached bundles compiled for registration, see :class:`flask_journey.plan.RegistrationPlan`
+
+        :return: :class:`flask_journey.plan.RegistrationPlan`
+        """
+
+        if self._plan is None:
+            self._plan = RegistrationPlan(self._journey_path, list(self._attached_bundles))
+
+        return self._plan
+
+    def _state(self, app=None):
+        """Returns the Journey state of an app, by default the current app if Journey was initialized on it,
+        otherwise the app Journey was last initialized on
+
+        :param app: App to return the state of
+        :return: :class:`flask_journey.plan.AppState`
+        """
+
+        if app is None:
+            if not has_app_context() or current_app.extensions.get('journey') is not self:
+                return self._last_state
+
+            app = current_app
+
+        return app.extensions[STATE_KEY]
+
+    @property
+    def _registered_bundles(self):
+        return self.routes_detailed
+
+    @property
+    def _pending_bundles(self):
+        return self._state().pending_bundles
+
+    @property
+    def response_cache(self):
+        """Returns the response cache of the current app, or the app Journey was last initialized on outside of
+        app contexts
+
+        :return: :class:`flask_journey.response_cache.ResponseCache` object, None before initializing an app
+        """
+
+        return self._state().response_cache
+
+    def warm_up(self, app):
+        """Registers all bundles still pending lazy registration
+
+        :param app: App the bundles are registered on
+        """
+
+        self.register_pending(app)
+
+    def register_pending(self, app):
+        """Registers all bundles pending lazy registration. Flask only allows registering blueprints until the app
+        handles its first request, before which :class:`flask_journey.lazy.LazyRegistrationMiddleware` calls this.
+
+        :param app: App the bundles are registered on
+        """
+
+        state = self._state(app)
+
+        with state.pending_lock:
+            if not state.pending_bundles:
+                return
+
+            self._register_bundles(app, list(state.pending_bundles))
+            del state.pending_bundles[:]
+
+    def _register_bundles(self, app, paths):
+        """Replays the plan of bundles into an app: registers their blueprints, and resolves their routes
+        unless another app already did
+
+        :param app: App to register the bundles on
+        :param paths: Full paths of the bundles in the app's plan
+        """
+
+        profiler = self._profiler
+        state = self._state(app)
+        plan = state.plan
+        compiled = []
+
+        for path in paths:
+            bundle_plan = plan.compile(path, profiler)
+
+            for bp_plan in bundle_plan.blueprints:
+                with profiler.measure('register_blueprint', bundle_plan.path, bp_plan.blueprint.name):
+                    app.register_blueprint(bp_plan.blueprint, url_prefix=bp_plan.base_path)
+
+            compiled.append(bundle_plan)
+
+        with plan.lock:
+            unresolved = [bundle_plan for bundle_plan in compiled if plan.record(bundle_plan) is None]
+
+            if unresolved:
+                self._resolve_routes(app, plan, unresolved)
+
+        state.registered_bundles.extend(plan.record(bundle_plan) for bundle_plan in compiled)
+        state.invalidate_views()
+
+    def _resolve_routes(self, app, plan, bundle_plans):
+        """Collects the routes and schemas of newly registered bundles, shared by all apps using the plan.
+        Routes are read from the plan's snapshot if loaded, otherwise extracted from the app's URL map.
+
+        :param app: App the bundles were registered on
+        :param plan: :class:`flask_journey.plan.RegistrationPlan` of the app
+        :param bundle_plans: List of :class:`flask_journey.plan.BundlePlan`
+        """
+
+        profiler = self._profiler
+
+        for bundle_plan in bundle_plans:
+            self._path_index.add_bundle(bundle_plan.full_path)
+
+            for bp_plan in bundle_plan.blueprints:
+                bp = bp_plan.blueprint
+
+                if bundle_plan.compression is not None:
+                    self._compression[bp.name] = bundle_plan.compression
+
+                # Resolve nested schemas of its routes now rather than on their first requests
+                with profiler.measure('warm_schemas', bundle_plan.path, bp.name):
+                    self.schemas.collect(bp)
+
+        snapshot = plan.snapshot or {}
+        index = None
+        url_rules = None
+
+        for bundle_plan in bundle_plans:
+            bundle_routes = []
+
+            for bp_plan in bundle_plan.blueprints:
+                name = bp_plan.blueprint.name
+                routes = snapshot.get((bundle_plan.path, name))
+
+                if routes is not None:
+                    if url_rules is None:
+                        with profiler.measure('check_snapshot'):
+                            url_rules = rules_by_blueprint(app.url_map)
+
+                    # Trust the snapshot only as far as it matches the URL map
+                    with profiler.measure('check_snapshot', bundle_plan.path, name):
+                        if not snapshot_matches(routes, bp_plan.base_path, url_rules.get(name, ())):
+                            routes = None
+
+                if routes is None:
+                    if index is None:
+                        # Index the URL map once all blueprints are in, instead of scanning it once per blueprint
+                        with profiler.measure('index_rules'):
+                            index = RuleIndex(app.url_map)
+
+                    with profiler.measure('get_blueprint_routes', bundle_plan.path, name):
+                        routes = self._blueprint_records(app, bp_plan.base_path, name, index)
+
+                with profiler.measure('index_paths', bundle_plan.path, name):
+                    self._path_index.add_blueprint(bundle_plan.full_path, name, bp_plan.base_path, routes)
+
+                bundle_routes.append(routes)
+
+            plan.resolve(bundle_plan, bundle_routes)
+
+    def write_snapshot(self, filename=None, app=None):
+        """Writes the routes of the bundles registered on an app to a snapshot file, for other processes
+        initializing apps with the same bundles to pass to :meth:`init_app`. Bundles pending lazy registration
+        get registered first.
+
+        :param filename: Snapshot file path, defaults to the snapshot passed to :meth:`init_app`
+        :param app: App to snapshot, defaults to the current app or the app initialized last
+        :return: Key of the snapshot, see :func:`flask_journey.snapshot.snapshot_key`
+        :raises:
+            - ValueError if no filename was passed or configured
+        """
+
+        filename = filename or self.snapshot_path
+
+        if filename is None:
+            raise ValueError('No snapshot path passed to write_snapshot or init_app')
+
+        if app is None:
+            app = current_app._get_current_object() if has_app_context() else None
+
+        state = self._state(app)
+
+        if app is not None:
+            self.register_pending(app)
+
+        write_snapshot(filename, state.plan.key, [bundle.as_dict() for bundle in state.registered_bundles],
+                       self.json_backend.dumps)
+
+        return state.plan.key
+
+    def resolve(self, path, method=None):
+        """Returns the bundle, blueprint and endpoint serving a URL path, without walking the route listings,
+        e.g. for tagging requests in `before_request` hooks
+
+        :param path: URL path, e.g. `request.path`
+        :param method: HTTP method, to tell apart endpoints sharing a rule
+        :return: :class:`flask_journey.lookup.RouteMatch` or None if the path is outside all bundles
+        """
+
+        return self._path_index.resolve(path, method)
+
+    def _compress_response(self, response):
+        """Compresses responses of blueprints registered by bundles with compression enabled"""
+
+        compression = self._compression.get(request.blueprint)
+
+        if compression is None:
+            return response
+
+        return compress_response(response, compression)
+
+    @property
+    def startup_report(self):
+        """Returns startup timings per bundle and blueprint, if Journey was created with `profile=True`.
+        See :class:`flask_journey.profiling.StartupProfiler` for the recorded phases.
+
+        :return: dict or None
+        """
+
+        return self._profiler.report
 
     @property
     def routes_detailed(self):
-        """Returns a detailed list of bundles along with blueprints and routes
+        """Returns a detailed list of bundles along with blueprints and routes, built on each access from the
+        :class:`flask_journey.records.BundleRecord` of each registered bundle. Use :attr:`routes_json` for
+        serving them repeatedly.
 
-        :return: List of blueprint routes
+        :return: Tuple of bundle dicts
         """
 
-        return self._registered_bundles
+        return tuple(bundle.as_dict() for bundle in self._state().registered_bundles)
 
     @property
     def routes_simple(self):
@@ -80,22 +380,49 @@ class Journey(object):
         :return: Tuple containing endpoint, path and allowed methods for each route
         """
 
-        routes = []
+        state = self._state()
 
-        for bundle in self._registered_bundles:
-            bundle_path = bundle['path']
-            for blueprint in bundle['blueprints']:
-                bp_path = blueprint['path']
-                for child in blueprint['routes']:
-                    routes.append(
-                        (
-                            child['endpoint'],
-                            bundle_path + bp_path + child['path'],
-                            child['methods']
+        if state.routes_simple is None:
+            routes = []
+
+            # Method frozenset -> tuple, shared by routes allowing the same methods
+            methods = {}
+
+            for bundle in state.registered_bundles:
+                bundle_path = bundle.path
+                for blueprint in bundle.blueprints:
+                    prefix = bundle_path + blueprint.path
+                    for child in blueprint.routes:
+                        if child.methods not in methods:
+                            methods[child.methods] = tuple(child.methods)
+
+                        routes.append(
+                            (
+                                child.endpoint,
+                                prefix + child.path,
+                                methods[child.methods]
+                            )
                         )
-                    )
 
-        return routes
+            state.routes_simple = tuple(routes)
+
+        return state.routes_simple
+
+    @property
+    def routes_json(self):
+        """Returns `routes_detailed` encoded as JSON with the Journey JSON backend, e.g. for serving
+        route listings without encoding them on every request. Only the encoded bytes are kept.
+
+        :return: bytes
+        """
+
+        state = self._state()
+
+        if state.routes_json is None:
+            data = self.json_backend.dumps([bundle.as_dict() for bundle in state.registered_bundles])
+            state.routes_json = data.encode('utf-8') if not isinstance(data, bytes) else data
+
+        return state.routes_json
 
     def _bundle_exists(self, path):
         """Checks if a bundle exists at the provided path
@@ -104,54 +431,65 @@ class Journey(object):
         :return: bool
         """
 
-        for attached_bundle in self._attached_bundles:
-            if path == attached_bundle.path:
-                return True
+        return path in self._attached_bundles
 
-        return False
+    def attach_deferred(self, path, import_name):
+        """Attaches a bundle by import path. The bundle module isn't imported until the bundle gets registered,
+        which, in lazy mode, is on the app's first request.
 
-    def attach_bundle(self, bundle):
-        """Attaches a bundle object
-
-        :param bundle: :class:`flask_journey.BlueprintBundle` object
+        :param path: Path of the bundle
+        :param import_name: Import path of the :class:`flask_journey.BlueprintBundle` object, e.g. `app.bundles:v1`
         :raises:
-            - IncompatibleBundle if the bundle is not of type `BlueprintBundle`
-            - ConflictingPath if a bundle already exists at bundle.path
-            - MissingBlueprints if the bundle doesn't contain any blueprints
+            - ConflictingPath if a bundle already exists at path
         """
 
-        if not isinstance(bundle, BlueprintBundle):
-            raise IncompatibleBundle('BlueprintBundle object passed to attach_bundle must be of type {0}'
-                                     .format(BlueprintBundle))
-        elif len(bundle.blueprints) == 0:
-            raise MissingBlueprints("Bundles must contain at least one flask.Blueprint")
-        elif self._bundle_exists(bundle.path):
+        bundle = DeferredBundle(path, import_name)
+
+        if self._bundle_exists(bundle.path):
             raise ConflictingPath("Duplicate bundle path {0}".format(bundle.path))
         elif self._journey_path == bundle.path == '/':
             raise ConflictingPath("Bundle path and Journey path cannot both be {0}".format(bundle.path))
 
-        self._attached_bundles.append(bundle)
+        self._attached_bundles.add(bundle.path, bundle)
+        self._plan = None
 
-    def _register_blueprint(self, app, bp, bundle_path, child_path, description):
-        """Register and return info about the registered blueprint
+    def attach_bundle(self, bundle):
+        """Attaches a bundle object
 
-        :param bp: :class:`flask.Blueprint` object
-        :param bundle_path: the URL prefix of the bundle
-        :param child_path: blueprint relative to the bundle path
-        :return: Dict with info about the blueprint
+        :param bundle: :class:`flask_journey.BlueprintBundle` object
+        :raises:
+            - IncompatibleBundle if the bundle is not of type `BlueprintBundle`
+            - ConflictingPath if a bundle already exists at bundle.path
+            - MissingBlueprints if the bundle doesn't contain any blueprints
         """
 
-        base_path = sanitize_path(self._journey_path + bundle_path + child_path)
+        with self._profiler.measure('attach_bundle', getattr(bundle, 'path', None)):
+            if not isinstance(bundle, BlueprintBundle):
+                raise IncompatibleBundle('BlueprintBundle object passed to attach_bundle must be of type {0}'
+                                         .format(BlueprintBundle))
+            elif len(bundle.blueprints) == 0:
+                raise MissingBlueprints("Bundles must contain at least one flask.Blueprint")
+            elif self._bundle_exists(bundle.path):
+                raise ConflictingPath("Duplicate bundle path {0}".format(bundle.path))
+            elif self._journey_path == bundle.path == '/':
+                raise ConflictingPath("Bundle path and Journey path cannot both be {0}".format(bundle.path))
+
+        self._attached_bundles.add(bundle.path, bundle)
+        self._plan = None
+
+    def detach_bundle(self, path):
+        """Detaches a bundle, before it gets registered by :meth:`init_app`
+
+        :param path: Path of the bundle
+        :return: The detached bundle object
+        :raises:
+            - KeyError if no bundle is attached at path
+        """
 
-        app.register_blueprint(bp, url_prefix=base_path)
+        bundle = self._attached_bundles.remove(sanitize_path(path))
+        self._plan = None
 
-        return {
-            'name': bp.name,
-            'path': child_path,
-            'import_name': bp.import_name,
-            'description': description,
-            'routes': self.get_blueprint_routes(app, base_path)
-        }
+        return bundle
 
     @staticmethod
     def get_bp_path(bp):
@@ -164,23 +502,32 @@ class Journey(object):
         return bp.url_prefix or '/' + bp.name
 
     @staticmethod
-    def get_blueprint_routes(app, base_path):
+    def get_blueprint_routes(app, base_path, bp_name=None, index=None):
         """Returns detailed information about registered blueprint routes matching the `BlueprintBundle` path
 
         :param app: App instance to obtain rules from
         :param base_path: Base path to return detailed route info for
+        :param bp_name: Only return routes registered by the blueprint with this name
+        :param index: :class:`flask_journey.rules.RuleIndex` of the app's URL map, created if not passed
         :return: List of route detail dicts
         """
 
+        return [route.as_dict() for route in Journey._blueprint_records(app, base_path, bp_name, index)]
+
+    @staticmethod
+    def _blueprint_records(app, base_path, bp_name=None, index=None):
+        """Returns the routes matching the `BlueprintBundle` path as records, see :meth:`get_blueprint_routes`
+
+        :return: List of :class:`flask_journey.records.RouteRecord`
+        """
+
+        if index is None:
+            index = RuleIndex(app.url_map)
+
         routes = []
 
-        for child in app.url_map.iter_rules():
-            if child.rule.startswith(base_path):
-                relative_path = child.rule[len(base_path):]
-                routes.append({
-                    'path': relative_path,
-                    'endpoint': child.endpoint,
-                    'methods': list(child.methods)
-                })
+        for child in index.rules(base_path, bp_name):
+            relative_path = child.rule[len(base_path):]
+            routes.append(RouteRecord.create(relative_path, child.endpoint, child.methods))
 
         return routes
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+
+class LazyRegistrationMiddleware(object):
+    """WSGI middleware registering deferred bundles before the app dispatches its first request.
+
+    Registration happens before Flask considers the app set up, through its public API. Concurrent first
+    requests wait on Journey's pending lock until all bundles are in, so no request sees a partially
+    registered URL map. Afterwards, requests only check whether any bundles are pending.
+
+    :param wsgi_app: The wrapped WSGI app
+    :param app: Flask app the bundles are registered on
+    :param journey: :class:`flask_journey.Journey` holding the pending bundles
+    """
+
+    def __init__(self, wsgi_app, app, journey):
+        self.wsgi_app = wsgi_app
+        self.app = app
+        self.journey = journey
+
+    def __call__(self, environ, start_response):
+        if self.journey._state(self.app).pending_bundles:
+            self.journey.register_pending(self.app)
+
+        return self.wsgi_app(environ, start_response)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import copy
+
+from marshmallow import fields
+
+from .cache import LRUCache
+
+QUERY_CACHE_SIZE = 256
+
+
+def _multi_value_keys(schema):
+    """Returns the query string keys a schema declares as multi-valued, i.e. keys of `fields.List` fields
+
+    :param schema: :class:`marshmallow.Schema` instance
+    :return: frozenset of keys
+    """
+
+    keys = set()
+
+    for name, field in schema.fields.items():
+        if isinstance(field, fields.List):
+            keys.add(getattr(field, 'load_from', None) or getattr(field, 'data_key', None) or name)
+
+    return frozenset(keys)
+
+
+def bind_schema(schema, strict):
+    """Returns a schema that validates with the given strictness, leaving the passed instance untouched.
+
+    Schema instances are commonly shared between routes with different `validate` settings, so toggling
+    `strict` on them per request isn't safe when requests are served concurrently.
+
+    :param schema: :class:`marshmallow.Schema` instance
+    :param strict: Whether validation errors should raise
+    :return: `schema` if it already has the requested strictness, otherwise a shallow copy of it
+    """
+
+    if schema.strict == strict:
+        return schema
+
+    bound = copy.copy(schema)
+    bound.strict = strict
+
+    return bound
+
+
+class QueryDecoder(object):
+    """Turns the query string arguments Werkzeug has already parsed into loadable data for a schema.
+
+    Keys backed by a `fields.List` in the schema get all their values, others get the first one.
+    Decoded results are memoized per raw query string.
+
+    :param schema: :class:`marshmallow.Schema` instance the data is decoded for
+    :param cache_size: Number of distinct query strings to remember
+    """
+
+    def __init__(self, schema, cache_size=QUERY_CACHE_SIZE):
+        self._multi_value_keys = _multi_value_keys(schema)
+        self._cache = LRUCache(cache_size)
+
+    def decode(self, args, query_string):
+        """Returns a dict of query arguments
+
+        :param args: :class:`werkzeug.datastructures.MultiDict` of parsed query arguments
+        :param query_string: The raw query string `args` was parsed from, used as cache key
+        :return: dict of arguments, multi-valued keys are tuples
+        """
+
+        if not query_string:
+            return {}
+
+        decoded = self._cache.get(query_string)
+
+        if decoded is None:
+            multi_value_keys = self._multi_value_keys
+            decoded = dict(
+                (key, tuple(args.getlist(key)) if key in multi_value_keys else args.get(key))
+                for key in args
+            )
+            self._cache.set(query_string, decoded)
+
+        return decoded
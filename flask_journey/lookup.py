@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+from collections import namedtuple
+
+RouteMatch = namedtuple('RouteMatch', ['bundle', 'blueprint', 'endpoint', 'rule'])
+RouteMatch.__doc__ = """Result of :meth:`PathIndex.resolve`: bundle path, blueprint name, endpoint and URL rule.
+Endpoint and rule are None for paths inside a bundle or blueprint that no rule matches, as is the blueprint
+for paths matching a bundle only."""
+
+
+class _Node(object):
+    __slots__ = ('children', 'wildcard', 'catchall', 'routes', 'owner')
+
+    def __init__(self):
+        # Static segment -> node
+        self.children = {}
+
+        # Node for segments with a converter, e.g. <int:id>
+        self.wildcard = None
+
+        # Routes of rules ending with a path converter, matching any remaining segments
+        self.catchall = None
+
+        # Method -> RouteMatch of rules ending at this node
+        self.routes = None
+
+        # RouteMatch of the bundle or blueprint mounted at this node
+        self.owner = None
+
+
+def _segments(path):
+    return [segment for segment in path.split('/') if segment]
+
+
+def _is_dynamic(segment):
+    return '<' in segment
+
+
+def _is_catchall(segment):
+    return segment.startswith('<path:') or segment.startswith('<path(')
+
+
+class PathIndex(object):
+    """Prefix trie over the paths of bundles, blueprints and rules registered by Journey, resolving URL paths
+    to their bundle, blueprint and endpoint in time proportional to the number of path segments.
+
+    Match records are created when paths are added, lookups return them as is. Static segments take
+    precedence over converters, as in werkzeug routing.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+
+    def _node(self, path):
+        node = self._root
+
+        for segment in _segments(path):
+            if _is_dynamic(segment):
+                if node.wildcard is None:
+                    node.wildcard = _Node()
+
+                node = node.wildcard
+            else:
+                node = node.children.setdefault(segment, _Node())
+
+        return node
+
+    def add_bundle(self, path):
+        """Adds a bundle
+
+        :param path: Full path of the bundle
+        """
+
+        node = self._node(path)
+
+        if node.owner is None:
+            node.owner = RouteMatch(path, None, None, None)
+
+    def add_blueprint(self, bundle_path, name, path, routes):
+        """Adds a blueprint and its routes
+
+        :param bundle_path: Full path of the blueprint's bundle
+        :param name: Blueprint name
+        :param path: Full path of the blueprint
+        :param routes: :class:`flask_journey.records.RouteRecord` of the blueprint, with paths relative to the
+            blueprint path
+        """
+
+        self._node(path).owner = RouteMatch(bundle_path, name, None, None)
+
+        for route in routes:
+            rule = path.rstrip('/') + route.path
+            segments = _segments(rule)
+            catchall = bool(segments) and _is_catchall(segments[-1])
+            node = self._node('/'.join(segments[:-1]) if catchall else rule)
+            match = RouteMatch(bundle_path, name, route.endpoint, rule)
+
+            if catchall:
+                if node.catchall is None:
+                    node.catchall = {}
+
+                target = node.catchall
+            else:
+                if node.routes is None:
+                    node.routes = {}
+
+                target = node.routes
+
+            for method in route.methods:
+                target.setdefault(method, match)
+
+    @staticmethod
+    def _pick(routes, method):
+        if method is None:
+            return next(iter(routes.values()))
+
+        return routes.get(method)
+
+    def _resolve(self, node, segments, i, method, owner):
+        if node.owner is not None:
+            owner = node.owner
+
+        if i == len(segments):
+            if node.routes is not None:
+                match = self._pick(node.routes, method)
+
+                if match is not None:
+                    return match, True
+
+            return owner, False
+
+        best = None
+        child = node.children.get(segments[i])
+
+        if child is not None:
+            match, exact = self._resolve(child, segments, i + 1, method, owner)
+
+            if exact:
+                return match, True
+
+            best = match
+
+        if node.wildcard is not None:
+            match, exact = self._resolve(node.wildcard, segments, i + 1, method, owner)
+
+            if exact:
+                return match, True
+
+            best = best or match
+
+        if node.catchall is not None:
+            match = self._pick(node.catchall, method)
+
+            if match is not None:
+                return match, True
+
+        return best or owner, False
+
+    def resolve(self, path, method=None):
+        """Returns the bundle, blueprint and endpoint serving a URL path
+
+        :param path: URL path, e.g. `request.path`
+        :param method: HTTP method, to tell apart endpoints sharing a rule. Any endpoint of the rule if None
+        :return: :class:`RouteMatch` or None if the path is outside all bundles
+        """
+
+        return self._resolve(self._root, _segments(path), 0, method, None)[0]
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+import weakref
+import threading
+
+from bisect import bisect_left
+from timeit import default_timer
+
+from flask import current_app, request
+
+PHASES = ('query', 'body', 'handler', 'serialize')
+
+# Upper bounds, in seconds, of the latency histogram buckets
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _EndpointStats(object):
+    """Counters for one endpoint, only ever written by a single thread"""
+
+    __slots__ = ('requests', 'validation_failures', 'histograms')
+
+    def __init__(self):
+        self.requests = 0
+        self.validation_failures = 0
+
+        # phase -> [bucket counts (last one is +Inf), sum]
+        self.histograms = dict((phase, [[0] * (len(BUCKETS) + 1), 0.0]) for phase in PHASES)
+
+    def observe(self, phase, elapsed):
+        histogram = self.histograms[phase]
+        histogram[0][bisect_left(BUCKETS, elapsed)] += 1
+        histogram[1] += elapsed
+
+    def merge(self, other):
+        """Adds the counters of another :class:`_EndpointStats` to these"""
+
+        self.requests += other.requests
+        self.validation_failures += other.validation_failures
+
+        for phase, (counts, elapsed) in other.histograms.items():
+            histogram = self.histograms[phase]
+            histogram[0] = [a + b for a, b in zip(histogram[0], counts)]
+            histogram[1] += elapsed
+
+
+class _ShardOwner(object):
+    """Kept in a thread-local only, collected when its thread exits"""
+
+    __slots__ = ('__weakref__', )
+
+
+class RouteMetrics(object):
+    """Per-endpoint request metrics collected by `route`.
+
+    Each thread writes to its own counters, so recording needs no locking, and readers sum up the
+    counters of all threads. Counters of exited threads are merged into a single set, so thread per
+    request servers don't accumulate one set per thread ever started.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        # id of the owner in the thread-local -> endpoint -> stats, of live threads
+        self._shards = {}
+
+        # endpoint -> stats, of exited threads
+        self._retired = {}
+
+    def stats(self, endpoint):
+        """Returns the calling thread's counters for an endpoint
+
+        :param endpoint: Endpoint name
+        :return: :class:`_EndpointStats` object
+        """
+
+        shard = getattr(self._local, 'shard', None)
+
+        if shard is None:
+            shard = self._local.shard = {}
+            owner = self._local.owner = _ShardOwner()
+
+            # Only taken once per thread
+            with self._lock:
+                self._shards[id(owner)] = shard
+
+            weakref.finalize(owner, self._retire, id(owner))
+
+        stats = shard.get(endpoint)
+
+        if stats is None:
+            stats = shard[endpoint] = _EndpointStats()
+
+        return stats
+
+    def _retire(self, key):
+        """Merges the counters of an exited thread"""
+
+        with self._lock:
+            shard = self._shards.pop(key, None)
+
+            for endpoint, stats in (shard or {}).items():
+                retired = self._retired.get(endpoint)
+
+                if retired is None:
+                    retired = self._retired[endpoint] = _EndpointStats()
+
+                retired.merge(stats)
+
+    def snapshot(self):
+        """Returns the metrics of all threads combined
+
+        :return: dict of endpoint -> dict with `requests`, `validation_failures` and per-phase histograms
+            (`buckets` as (upper bound, cumulative count) pairs, `sum` and `count`)
+        """
+
+        totals = {}
+
+        with self._lock:
+            shards = list(self._shards.values())
+            shards.append(dict((endpoint, _copy(stats)) for endpoint, stats in self._retired.items()))
+
+        for shard in shards:
+            for endpoint, stats in list(shard.items()):
+                total = totals.get(endpoint)
+
+                if total is None:
+                    total = totals[endpoint] = {
+                        'requests': 0,
+                        'validation_failures': 0,
+                        'phases': dict((phase, [[0] * (len(BUCKETS) + 1), 0.0]) for phase in PHASES),
+                    }
+
+                total['requests'] += stats.requests
+                total['validation_failures'] += stats.validation_failures
+
+                for phase, (counts, elapsed) in stats.histograms.items():
+                    phase_total = total['phases'][phase]
+                    phase_total[0] = [a + b for a, b in zip(phase_total[0], counts)]
+                    phase_total[1] += elapsed
+
+        for total in totals.values():
+            for phase, (counts, elapsed) in total['phases'].items():
+                cumulative = []
+                count = 0
+
+                for bound, bucket_count in zip(BUCKETS + (float('inf'), ), counts):
+                    count += bucket_count
+                    cumulative.append((bound, count))
+
+                total['phases'][phase] = {'buckets': cumulative, 'sum': elapsed, 'count': count}
+
+        return totals
+
+    def prometheus(self):
+        """Returns the metrics in the Prometheus text exposition format
+
+        :return: str
+        """
+
+        snapshot = sorted(self.snapshot().items())
+        lines = [
+            '# HELP journey_requests_total Requests handled by Journey routes.',
+            '# TYPE journey_requests_total counter',
+        ]
+
+        for endpoint, total in snapshot:
+            lines.append('journey_requests_total{{endpoint="{0}"}} {1}'.format(_escape(endpoint), total['requests']))
+
+        lines.extend([
+            '# HELP journey_validation_failures_total Requests rejected with 422 by query or body validation.',
+            '# TYPE journey_validation_failures_total counter',
+        ])
+
+        for endpoint, total in snapshot:
+            lines.append('journey_validation_failures_total{{endpoint="{0}"}} {1}'
+                         .format(_escape(endpoint), total['validation_failures']))
+
+        lines.extend([
+            '# HELP journey_phase_seconds Time spent per request phase.',
+            '# TYPE journey_phase_seconds histogram',
+        ])
+
+        for endpoint, total in snapshot:
+            for phase in PHASES:
+                histogram = total['phases'][phase]
+                labels = 'endpoint="{0}",phase="{1}"'.format(_escape(endpoint), phase)
+
+                for bound, count in histogram['buckets']:
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append('journey_phase_seconds_bucket{{{0},le="{1}"}} {2}'.format(labels, le, count))
+
+                lines.append('journey_phase_seconds_sum{{{0}}} {1!r}'.format(labels, histogram['sum']))
+                lines.append('journey_phase_seconds_count{{{0}}} {1}'.format(labels, histogram['count']))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _copy(stats):
+    copied = _EndpointStats()
+    copied.merge(stats)
+
+    return copied
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestTimer(object):
+    """Times the phases of a single request, each :meth:`mark` closing the phase started by the previous one
+
+    :param stats: :class:`_EndpointStats` of the requested endpoint
+    """
+
+    __slots__ = ('_stats', '_last', '_finished')
+
+    def __init__(self, stats):
+        self._stats = stats
+        self._last = default_timer()
+        self._finished = False
+
+    def mark(self, phase):
+        now = default_timer()
+        self._stats.observe(phase, now - self._last)
+        self._last = now
+
+    def finish(self, validation_failed=False):
+        """Counts the request, only the first call per request counts"""
+
+        if self._finished:
+            return
+
+        self._finished = True
+        stats = self._stats
+        stats.requests += 1
+
+        if validation_failed:
+            stats.validation_failures += 1
+
+
+class NullTimer(object):
+    """Timer used when metrics are disabled"""
+
+    __slots__ = ()
+
+    def mark(self, phase):
+        pass
+
+    def finish(self, validation_failed=False):
+        pass
+
+
+null_timer = NullTimer()
+
+
+def start_timer():
+    """Starts timing the current request, if Journey was initialized on the app with metrics enabled
+
+    :return: :class:`RequestTimer` or :class:`NullTimer` object
+    """
+
+    journey = current_app.extensions.get('journey')
+
+    if journey is None or journey.metrics is None:
+        return null_timer
+
+    return RequestTimer(journey.metrics.stats(request.endpoint))
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+import json
+import codecs
+
+from flask import request
+from marshmallow import ValidationError
+from werkzeug.exceptions import BadRequest
+
+from .backends import current_json_backend
+
+CHUNK_SIZE = 64 * 1024
+
+_whitespace = ' \t\n\r'
+_delimiters = _whitespace + ',]'
+
+
+class _ArrayReader(object):
+    """Reads the elements of a top-level JSON array from a byte stream, one at a time
+
+    :param stream: File-like object to read from
+    :param chunk_size: Number of bytes to read at a time
+    """
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Reads the next chunk into the buffer, dropping what has been consumed
+
+        :return: False if the stream is exhausted
+        """
+
+        if self._eof:
+            return False
+
+        chunk = self._stream.read(self._chunk_size)
+        self._eof = not chunk
+        self._buffer = self._buffer[self._pos:] + self._text_decoder.decode(chunk, final=self._eof)
+        self._pos = 0
+
+        return True
+
+    def _next_char(self):
+        """Skips whitespace and returns the next character without consuming it, or None at the end"""
+
+        while True:
+            buffer, pos = self._buffer, self._pos
+
+            while pos < len(buffer) and buffer[pos] in _whitespace:
+                pos += 1
+
+            self._pos = pos
+
+            if pos < len(buffer):
+                return buffer[pos]
+            elif not self._fill():
+                return None
+
+    def _expect(self, chars):
+        char = self._next_char()
+
+        if char is None or char not in chars:
+            raise ValueError('Expected one of {0!r}, got {1!r}'.format(chars, char))
+
+        self._pos += 1
+        return char
+
+    def _value(self):
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                if not self._fill():
+                    raise
+                continue
+
+            # Numbers cut off by the end of a chunk decode fine, so only trust values followed by a delimiter
+            if (end == len(self._buffer) or self._buffer[end] not in _delimiters) and self._fill():
+                continue
+
+            self._pos = end
+            return value
+
+    def __iter__(self):
+        self._expect('[')
+
+        if self._next_char() == ']':
+            self._pos += 1
+            return
+
+        while True:
+            self._next_char()
+            yield self._value()
+
+            if self._expect(',]') == ']':
+                break
+
+        if self._next_char() is not None:
+            raise ValueError('Unexpected data after JSON array')
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE):
+    """Yields the elements of a top-level JSON array, reading the stream incrementally
+
+    :param stream: File-like object returning bytes
+    :param chunk_size: Number of bytes to read at a time
+    :raises:
+        - ValueError if the stream doesn't contain a valid JSON array
+    """
+
+    return iter(_ArrayReader(stream, chunk_size))
+
+
+def iter_ndjson(stream, loads):
+    """Yields the documents of a newline-delimited JSON stream, one line at a time
+
+    :param stream: File-like object returning bytes
+    :param loads: Function decoding a single JSON document
+    :raises:
+        - ValueError if a line isn't valid JSON
+    """
+
+    for line in iter(stream.readline, b''):
+        if line.strip():
+            yield loads(line)
+
+
+def stream_body_items(schema):
+    """Yields the items of the current request's body, a JSON array or NDJSON, each one loaded with `schema`
+    (as `schema.load` results). Only one item is held in memory at a time.
+
+    :param schema: :class:`marshmallow.Schema` instance, items are loaded with many=False
+    :raises:
+        - BadRequest if the body isn't a valid JSON array or NDJSON
+        - ValidationError with the failing item's index as key, if an item fails validation
+    """
+
+    if request.mimetype in ('application/x-ndjson', 'application/jsonlines'):
+        items = iter_ndjson(request.stream, current_json_backend().loads)
+    else:
+        items = iter_json_array(request.stream)
+
+    index = 0
+
+    while True:
+        try:
+            item = next(items)
+        except StopIteration:
+            return
+        except ValueError:
+            raise BadRequest('Failed to decode JSON item {0}'.format(index))
+
+        try:
+            result = schema.load(item, many=False)
+        except ValidationError as err:
+            raise ValidationError({index: err.messages})
+
+        yield result
+        index += 1
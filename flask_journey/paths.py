@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import re
+import sys
+
+from functools import lru_cache
+
+from .exceptions import InvalidPath
+
+# Generated apps have tens of thousands of distinct bundle and blueprint paths
+CACHE_SIZE = 65536
+
+_slashes = re.compile(r'/+')
+
+
+def is_canonical(path):
+    """Checks whether a path is already sanitized: starts with a slash, has no duplicate or trailing slashes
+
+    :param path: path to check
+    :return: bool
+    """
+
+    return path == '/' or (path[:1] == '/' and path[-1] != '/' and '//' not in path)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def sanitize_path(path):
+    """Performs sanitation of the path after validating. Results are memoized and interned.
+
+    :param path: path to sanitize
+    :return: path
+    :raises:
+        - InvalidPath if the path doesn't start with a slash
+    """
+
+    if is_canonical(path):  # Nothing to do, just return
+        return sys.intern(path)
+
+    if path[:1] != '/':
+        raise InvalidPath('The path must start with a slash')
+
+    # Deduplicate slashes in path and strip trailing slashes
+    return sys.intern(_slashes.sub('/', path).rstrip('/'))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def join_paths(*paths):
+    """Joins and sanitizes paths, e.g. the Journey, bundle and blueprint paths making up a blueprint's prefix
+
+    :param paths: paths to join
+    :return: path
+    :raises:
+        - InvalidPath if the joined path doesn't start with a slash
+    """
+
+    return sanitize_path(''.join(paths))
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict, namedtuple
+from threading import Lock, RLock
+
+from .paths import join_paths
+from .batch import create_batch_blueprint
+from .compression import get_compression
+from .blueprint_bundle import DeferredBundle
+from .snapshot import snapshot_key, read_snapshot
+from .records import BundleRecord, BlueprintRecord
+
+BlueprintPlan = namedtuple('BlueprintPlan', ['blueprint', 'path', 'base_path', 'description'])
+BlueprintPlan.__doc__ = """A blueprint to register: the :class:`flask.Blueprint`, its path relative to the bundle,
+the URL prefix it gets registered at and its description."""
+
+BundlePlan = namedtuple('BundlePlan', ['path', 'full_path', 'description', 'blueprints', 'compression'])
+BundlePlan.__doc__ = """A compiled bundle: its path, its path prefixed with the Journey path, its description, a tuple
+of :class:`BlueprintPlan` and its :class:`flask_journey.compression.Compression` settings."""
+
+
+class RegistrationPlan(object):
+    """The attached bundles of a Journey, compiled once and replayed into every app initialized with it.
+
+    Bundles are compiled on first use: deferred bundles get imported, paths joined and sanitized and batch
+    blueprints created. The route listings are extracted from the URL map of the first app a bundle gets
+    registered on and shared with the apps it's registered on afterwards, which only need to register its
+    blueprints.
+
+    :param journey_path: Path prefixing all bundle paths
+    :param bundles: Attached :class:`flask_journey.BlueprintBundle` or deferred bundle objects
+    """
+
+    def __init__(self, journey_path, bundles):
+        self.journey_path = journey_path
+        self._bundles = OrderedDict((join_paths(journey_path, bundle.path), bundle) for bundle in bundles)
+        self._compiled = {}
+        self._key = None
+
+        # Full path -> :class:`flask_journey.records.BundleRecord` of bundles whose routes have been resolved
+        self._records = {}
+
+        # (bundle path, blueprint name) -> routes, read from a snapshot matching the plan
+        self.snapshot = None
+
+        # Serializes compiling and route resolution across apps initialized concurrently
+        self.lock = RLock()
+
+    @property
+    def paths(self):
+        """Returns the full paths of the bundles in the plan, in attach order
+
+        :return: list
+        """
+
+        return list(self._bundles)
+
+    @property
+    def key(self):
+        """Returns the hash of the bundle definitions the plan was compiled from,
+        see :func:`flask_journey.snapshot.snapshot_key`
+
+        :return: hex digest
+        """
+
+        if self._key is None:
+            self._key = snapshot_key(self.journey_path, self._bundles.values())
+
+        return self._key
+
+    def load_snapshot(self, filename, loads):
+        """Reads routes from a snapshot, used instead of extracting them from the URL map if it matches the plan
+
+        :param filename: Snapshot file path
+        :param loads: Function decoding JSON bytes
+        :return: bool, whether the snapshot matched
+        """
+
+        if self.snapshot is None:
+            self.snapshot = read_snapshot(filename, self.key, loads)
+
+        return self.snapshot is not None
+
+    def compile(self, full_path, profiler):
+        """Returns the compiled bundle at a path, compiling it on first use
+
+        :param full_path: Path of the bundle, prefixed with the Journey path
+        :param profiler: :class:`flask_journey.profiling.StartupProfiler` recording imports
+        :return: :class:`BundlePlan`
+        :raises:
+            - KeyError if no bundle is attached at full_path
+        """
+
+        compiled = self._compiled.get(full_path)
+
+        if compiled is not None:
+            return compiled
+
+        with self.lock:
+            compiled = self._compiled.get(full_path)
+
+            if compiled is None:
+                compiled = self._compiled[full_path] = self._compile(self._bundles[full_path], full_path, profiler)
+
+        return compiled
+
+    def _compile(self, bundle, full_path, profiler):
+        if isinstance(bundle, DeferredBundle):
+            with profiler.measure('import', bundle.path):
+                bundle = bundle.load()
+
+        blueprints = list(bundle.blueprints)
+
+        if getattr(bundle, 'batch', False):
+            blueprints.append((create_batch_blueprint(bundle.path, bundle.batch_workers), 'Batch requests'))
+
+        planned = []
+
+        for (bp, description) in blueprints:
+            child_path = bp.url_prefix or '/' + bp.name
+            planned.append(BlueprintPlan(bp, child_path, join_paths(self.journey_path, bundle.path, child_path),
+                                         description))
+
+        return BundlePlan(bundle.path, full_path, bundle.description, tuple(planned),
+                          get_compression(getattr(bundle, 'compress', None)))
+
+    def record(self, bundle_plan):
+        """Returns the route listing record of a compiled bundle
+
+        :param bundle_plan: :class:`BundlePlan`
+        :return: :class:`flask_journey.records.BundleRecord` or None if its routes haven't been resolved yet
+        """
+
+        return self._records.get(bundle_plan.full_path)
+
+    def resolve(self, bundle_plan, routes):
+        """Records the routes of a compiled bundle, for apps registering it afterwards to reuse
+
+        :param bundle_plan: :class:`BundlePlan`
+        :param routes: List with a sequence of :class:`flask_journey.records.RouteRecord` per blueprint
+        :return: :class:`flask_journey.records.BundleRecord`
+        """
+
+        blueprints = tuple(BlueprintRecord(bp_plan.blueprint.name, bp_plan.path, bp_plan.blueprint.import_name,
+                                           bp_plan.description, tuple(bp_routes))
+                           for bp_plan, bp_routes in zip(bundle_plan.blueprints, routes))
+
+        record = self._records[bundle_plan.full_path] = BundleRecord(bundle_plan.path, bundle_plan.description,
+                                                                     blueprints)
+
+        return record
+
+
+# Key of the per-app Journey state in `app.extensions`
+STATE_KEY = 'journey_state'
+
+
+class AppState(object):
+    """Journey state of a single app, kept in `app.extensions[STATE_KEY]`
+
+    :param plan: :class:`RegistrationPlan` the app was initialized with
+    :param response_cache: :class:`flask_journey.response_cache.ResponseCache` of the app's cached routes
+    """
+
+    def __init__(self, plan=None, response_cache=None):
+        self.plan = plan
+        self.response_cache = response_cache
+
+        # Route listing records of the bundles registered on the app, shared with other apps using the plan
+        self.registered_bundles = []
+
+        # Full paths of the bundles awaiting lazy registration
+        self.pending_bundles = []
+        self.pending_lock = Lock()
+
+        # Route views, built on first access after bundles are registered
+        self.routes_simple = None
+        self.routes_json = None
+
+    def invalidate_views(self):
+        """Discards the cached route views, to be rebuilt on next access"""
+
+        self.routes_simple = None
+        self.routes_json = None
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import pickle
+import threading
+
+from flask import current_app
+from marshmallow import ValidationError
+from werkzeug.exceptions import BadRequest
+
+from .backends import current_json_backend
+from .exceptions import IncompatibleSchema
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def default_body_pool():
+    """Returns the process pool used for offloaded body loading when Journey wasn't given one
+
+    :return: :class:`concurrent.futures.ProcessPoolExecutor` object
+    """
+
+    global _default_pool
+
+    with _default_pool_lock:
+        if _default_pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            _default_pool = ProcessPoolExecutor()
+
+    return _default_pool
+
+
+def current_body_pool():
+    """Returns the executor body loading is offloaded to for the current app
+
+    :return: :class:`concurrent.futures.Executor` object
+    """
+
+    journey = current_app.extensions.get('journey')
+
+    if journey is not None and journey.body_pool is not None:
+        return journey.body_pool
+
+    return default_body_pool()
+
+
+def ensure_picklable(schema):
+    """Checks that a schema can be sent to a worker process
+
+    :param schema: :class:`marshmallow.Schema` instance
+    :return: schema
+    :raises:
+        - IncompatibleSchema if the schema can't be pickled
+    """
+
+    try:
+        pickle.dumps(schema)
+    except Exception as err:
+        raise IncompatibleSchema('Schemas used with body_pool_threshold must be picklable: {0}'.format(err))
+
+    return schema
+
+
+def _load_body(schema, backend, data):
+    """Decodes and loads a request body, runs in a pool worker
+
+    :return: Tuple of outcome (ok, errors or invalid_json) and the `UnmarshalResult` or error messages
+    """
+
+    try:
+        json_data = backend.loads(data)
+    except ValueError:
+        return 'invalid_json', None
+
+    try:
+        return 'ok', schema.load(json_data if json_data is not None else {})
+    except ValidationError as err:
+        return 'errors', err.messages
+
+
+def submit_body_load(schema, data):
+    """Submits decoding and loading a raw request body with `schema` to the app's body pool
+
+    :param schema: :class:`marshmallow.Schema` instance
+    :param data: Raw JSON request body
+    :return: :class:`concurrent.futures.Future` object, pass its result to :func:`body_load_result`
+    """
+
+    return current_body_pool().submit(_load_body, schema, current_json_backend(), data)
+
+
+def body_load_result(outcome):
+    """Unpacks the outcome of an offloaded body load the way loading in-process would have ended
+
+    :param outcome: Result of the future returned by :func:`submit_body_load`
+    :return: `UnmarshalResult` of the schema
+    :raises:
+        - BadRequest if the body isn't valid JSON
+        - ValidationError if the body failed validation
+    """
+
+    status, value = outcome
+
+    if status == 'invalid_json':
+        raise BadRequest('Failed to decode JSON object')
+    elif status == 'errors':
+        raise ValidationError(value)
+
+    return value
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from timeit import default_timer
+
+
+class StartupProfiler(object):
+    """Records how long each Journey startup phase takes, per bundle and blueprint.
+
+    Phases:
+        - attach_bundle: bundle validation in :meth:`flask_journey.Journey.attach_bundle`
+        - import: importing bundles attached by import path
+        - register_blueprint: `app.register_blueprint`
+        - warm_schemas: collecting and warming route schemas, see :class:`flask_journey.schema_registry.SchemaRegistry`
+        - load_snapshot: reading a route snapshot passed to `init_app` (not bundle specific)
+        - check_snapshot: checking snapshot routes against the app's URL map
+        - index_rules: indexing the app's URL map (not bundle specific)
+        - get_blueprint_routes: route extraction
+        - index_paths: adding the blueprint's routes to the path lookup index
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self._phases = OrderedDict()
+        self._bundles = OrderedDict()
+
+    @contextmanager
+    def measure(self, phase, bundle_path=None, bp_name=None):
+        """Context manager timing a phase
+
+        :param phase: Phase name
+        :param bundle_path: Path of the bundle the phase belongs to
+        :param bp_name: Name of the blueprint the phase belongs to
+        """
+
+        start = default_timer()
+
+        try:
+            yield
+        finally:
+            self._record(phase, default_timer() - start, bundle_path, bp_name)
+
+    def _record(self, phase, elapsed, bundle_path, bp_name):
+        if bundle_path is None:
+            target = self._phases
+        else:
+            bundle = self._bundles.setdefault(bundle_path, {'phases': OrderedDict(), 'blueprints': OrderedDict()})
+
+            if bp_name is None:
+                target = bundle['phases']
+            else:
+                target = bundle['blueprints'].setdefault(bp_name, OrderedDict())
+
+        target[phase] = target.get(phase, 0) + elapsed
+
+    @property
+    def report(self):
+        """Returns the recorded timings, in seconds, along with per bundle and per blueprint totals,
+        bundles and blueprints ordered slowest first
+
+        :return: dict
+        """
+
+        bundles = []
+
+        for path, bundle in self._bundles.items():
+            blueprints = [
+                {'name': name, 'total': sum(phases.values()), 'phases': dict(phases)}
+                for name, phases in bundle['blueprints'].items()
+            ]
+            blueprints.sort(key=lambda bp: bp['total'], reverse=True)
+
+            bundles.append({
+                'path': path,
+                'total': sum(bundle['phases'].values()) + sum(bp['total'] for bp in blueprints),
+                'phases': dict(bundle['phases']),
+                'blueprints': blueprints,
+            })
+
+        bundles.sort(key=lambda b: b['total'], reverse=True)
+
+        return {
+            'total': sum(self._phases.values()) + sum(b['total'] for b in bundles),
+            'phases': dict(self._phases),
+            'bundles': bundles,
+        }
+
+
+class NullProfiler(object):
+    """Profiler used when startup profiling is disabled"""
+
+    enabled = False
+    report = None
+
+    @contextmanager
+    def measure(self, phase, bundle_path=None, bp_name=None):
+        yield
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+from collections import namedtuple
+
+# Distinct method sets -> shared frozenset, most apps only have a handful
+_methods = {}
+
+
+def shared_methods(methods):
+    """Returns a frozenset of HTTP methods shared by all routes allowing the same methods
+
+    :param methods: Iterable of method names
+    :return: frozenset
+    """
+
+    methods = frozenset(methods)
+
+    return _methods.setdefault(methods, methods)
+
+
+class _Record(object):
+    """Conversion of namedtuple records to the route listing dicts Journey returns"""
+
+    __slots__ = ()
+
+    def as_dict(self):
+        """Returns the record as a route listing dict of nested dicts and lists, methods included, e.g. for
+        encoding as JSON
+
+        :return: dict
+        """
+
+        data = {}
+
+        for key, value in zip(self._fields, self):
+            if isinstance(value, tuple) and not isinstance(value, _Record):
+                value = [item.as_dict() for item in value]
+            elif isinstance(value, frozenset):
+                value = list(value)
+
+            data[key] = value
+
+        return data
+
+
+class RouteRecord(_Record, namedtuple('RouteRecord', ['path', 'endpoint', 'methods'])):
+    """A route: its path relative to the blueprint, endpoint and frozenset of methods"""
+
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, path, endpoint, methods):
+        return cls(path, endpoint, shared_methods(methods))
+
+
+class BlueprintRecord(_Record, namedtuple('BlueprintRecord', ['name', 'path', 'import_name', 'description',
+                                                               'routes'])):
+    """A registered blueprint: its name, path relative to the bundle, import name, description and tuple of
+    :class:`RouteRecord`"""
+
+    __slots__ = ()
+
+
+class BundleRecord(_Record, namedtuple('BundleRecord', ['path', 'description', 'blueprints'])):
+    """A registered bundle: its path, description and tuple of :class:`BlueprintRecord`"""
+
+    __slots__ = ()
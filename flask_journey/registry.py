@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+
+from .exceptions import ConflictingPath, ConflictingBlueprint
+
+
+class Registry(object):
+    """Insertion-ordered collection with O(1) conflict checks, lookups and removal by key.
+    Iterating yields the values.
+    """
+
+    conflict_exception = KeyError
+    conflict_message = 'Duplicate key {0}'
+
+    def __init__(self):
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __getitem__(self, key):
+        return self._items[key]
+
+    def __repr__(self):
+        return '<{0} {1}>'.format(type(self).__name__, list(self._items))
+
+    def keys(self):
+        return list(self._items)
+
+    def get(self, key, default=None):
+        return self._items.get(key, default)
+
+    def add(self, key, value):
+        """Adds a value
+
+        :param key: Registry key
+        :param value: Value to add
+        :raises:
+            - `conflict_exception` if the key is already taken
+        """
+
+        if key in self._items:
+            raise self.conflict_exception(self.conflict_message.format(key))
+
+        self._items[key] = value
+
+    def remove(self, key):
+        """Removes and returns a value
+
+        :param key: Registry key
+        :return: Removed value
+        :raises:
+            - KeyError if the key isn't in the registry
+        """
+
+        return self._items.pop(key)
+
+
+class BundleRegistry(Registry):
+    """Bundles keyed by their sanitized path"""
+
+    conflict_exception = ConflictingPath
+    conflict_message = 'Duplicate bundle path {0}'
+
+
+class BlueprintRegistry(Registry):
+    """(blueprint, description) tuples keyed by blueprint name. Membership can be tested by name or blueprint."""
+
+    conflict_exception = ConflictingBlueprint
+    conflict_message = 'Duplicate blueprint name {0}'
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return key in self._items
+
+        entry = self._items.get(getattr(key, 'name', None))
+        return entry is not None and entry[0] is key
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+import json
+import uuid
+import hashlib
+
+from flask import current_app
+
+from .cache import LocalCache
+
+
+# Key of the response cache of apps without Journey in `app.extensions`
+EXTENSION_KEY = 'journey_response_cache'
+
+# Attribute of `route` views holding the route specific response cache they were created with
+VIEW_ATTRIBUTE = 'journey_response_cache'
+
+
+def _canonical(data):
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def cache_namespace():
+    """Returns the namespace of the current app's cache entries: the `JOURNEY_CACHE_NAMESPACE` config value,
+    or the app name. Apps sharing a name and a cache backend, e.g. tenants created by the same factory, need
+    their own namespace to not serve each other's responses.
+
+    :return: str
+    """
+
+    return current_app.config.get('JOURNEY_CACHE_NAMESPACE') or current_app.name
+
+
+class ResponseCache(object):
+    """Caches encoded `route` responses in a :class:`flask_journey.cache.CacheBackend`.
+
+    Entries are keyed on the app's :func:`cache_namespace`, endpoint, view args and validated query data. Keys
+    and invalidation need an app context. Invalidation replaces a generation
+    token stored in the backend alongside the entries, which orphans the old entries instead of having to
+    find and delete them, so it works the same with shared stores.
+
+    :param backend: :class:`flask_journey.cache.CacheBackend` object
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def _generation(self, *parts):
+        key = 'journey:generation:' + _canonical((cache_namespace(), ) + parts)
+        generation = self.backend.get(key)
+
+        if generation is None:
+            # Missing (or evicted) generations get a fresh token, so older entries can never match again
+            generation = uuid.uuid4().hex
+            self.backend.set(key, generation, ttl=0)
+
+        return generation
+
+    def key(self, endpoint, view_args=None, query_data=None, version=None):
+        """Returns the cache key of a response
+
+        :param endpoint: Endpoint name
+        :param view_args: URL rule arguments
+        :param query_data: Validated query data
+        :param version: Version token of the resource, changing it invalidates its cached responses
+        :return: str
+        """
+
+        view_args = view_args or {}
+
+        parts = (
+            cache_namespace(),
+            endpoint,
+            self._generation(endpoint),
+            view_args,
+            self._generation(endpoint, view_args) if view_args else None,
+            query_data,
+            version,
+        )
+
+        return 'journey:response:' + hashlib.sha1(_canonical(parts).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, data, ttl=None):
+        self.backend.set(key, data, ttl)
+
+    def invalidate(self, endpoint, **view_args):
+        """Invalidates cached responses of an endpoint
+
+        :param endpoint: Endpoint name, e.g. `planes.get_one`
+        :param view_args: Only invalidate responses for these URL rule arguments, e.g. `plane_id=1`
+        """
+
+        parts = (cache_namespace(), endpoint, view_args) if view_args else (cache_namespace(), endpoint)
+        key = 'journey:generation:' + _canonical(parts)
+        self.backend.set(key, uuid.uuid4().hex, ttl=0)
+
+
+def current_response_cache():
+    """Returns the response cache of the current app, kept in its Journey state, or an in-process one created
+    on first use if the app wasn't initialized with Journey
+
+    :return: :class:`ResponseCache` object
+    """
+
+    # Imported here, the plan module imports the route machinery depending on this one
+    from .plan import STATE_KEY
+
+    state = current_app.extensions.get(STATE_KEY)
+
+    if state is not None:
+        return state.response_cache
+
+    cache = current_app.extensions.get(EXTENSION_KEY)
+
+    if cache is None:
+        cache = current_app.extensions.setdefault(EXTENSION_KEY, ResponseCache(LocalCache()))
+
+    return cache
+
+
+def endpoint_response_cache(endpoint):
+    """Returns the response cache an endpoint of the current app caches in: the route specific cache of its
+    view, or the app's response cache
+
+    :param endpoint: Endpoint name, e.g. `planes.get_one`
+    :return: :class:`ResponseCache` object
+    """
+
+    cache = getattr(current_app.view_functions.get(endpoint), VIEW_ATTRIBUTE, None)
+
+    return cache if cache is not None else current_response_cache()
+
+
+def invalidate_cache(endpoint, **view_args):
+    """Invalidates cached responses of an endpoint in the cache it caches in, call it from routes modifying
+    the resources it serves
+
+    :param endpoint: Endpoint name, e.g. `planes.get_one`
+    :param view_args: Only invalidate responses for these URL rule arguments, e.g. `plane_id=1`
+    """
+
+    endpoint_response_cache(endpoint).invalidate(endpoint, **view_args)
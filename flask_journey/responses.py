@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+from flask import current_app, request, stream_with_context
+from werkzeug.exceptions import BadRequest
+
+from .backends import current_json_backend, FlaskBackend
+
+
+def request_json_bytes():
+    """Returns the raw body of the current request if it's a non-empty JSON body
+
+    :return: bytes or None
+    """
+
+    if not request.is_json:
+        return None
+
+    return request.get_data(cache=True) or None
+
+
+def decode_json(backend, data):
+    """Decodes a JSON request body
+
+    :param backend: :class:`flask_journey.backends.JSONBackend` to decode with
+    :param data: Raw request bytes
+    :return: Decoded object
+    :raises:
+        - BadRequest if the body isn't valid JSON
+    """
+
+    try:
+        return backend.loads(data)
+    except ValueError:
+        raise BadRequest('Failed to decode JSON object')
+
+
+def load_request_json():
+    """Decodes the JSON body of the current request straight from the raw request bytes
+
+    :return: Decoded object, or None if the request has no JSON body
+    :raises:
+        - BadRequest if the body isn't valid JSON
+    """
+
+    data = request_json_bytes()
+
+    if data is None:
+        return None
+
+    return decode_json(current_json_backend(), data)
+
+
+def json_mimetype():
+    """Returns the mimetype of the app's JSON responses
+
+    :return: str
+    """
+
+    provider = getattr(current_app, 'json', None)
+
+    return getattr(provider, 'mimetype', None) or current_app.config.get('JSONIFY_MIMETYPE') or 'application/json'
+
+
+def encoded_json_response(data, status=200):
+    """Creates a response from already encoded JSON
+
+    :param data: JSON bytes or text
+    :param status: HTTP status code
+    :return: :class:`flask.Response` object
+    """
+
+    return current_app.response_class(data, status=status, mimetype=json_mimetype())
+
+
+def json_response(data, status=200):
+    """Creates a JSON response using the app's JSON backend, or the app's JSON provider unless a backend
+    was chosen
+
+    :param data: Object to encode
+    :param status: HTTP status code
+    :return: :class:`flask.Response` object
+    """
+
+    backend = current_json_backend()
+
+    if isinstance(backend, FlaskBackend):
+        response = backend.response(data)
+        response.status_code = status
+
+        return response
+
+    return encoded_json_response(backend.dumps(data), status)
+
+
+def _iter_json_array(items, serialize_item, dumps):
+    """Yields a JSON array one serialized item at a time
+
+    :param items: Iterable of objects to serialize
+    :param serialize_item: Function serializing a single object
+    :param dumps: Function encoding a serialized object
+    """
+
+    yield b'['
+
+    first = True
+
+    for item in items:
+        if not first:
+            yield b','
+
+        yield dumps(serialize_item(item))
+        first = False
+
+    yield b']'
+
+
+def stream_json_array(items, serialize_item):
+    """Creates a chunked response encoding `items` as a JSON array, serializing items as they're sent
+
+    :param items: Iterable (list, generator) of objects to serialize
+    :param serialize_item: Function serializing a single object
+    :return: :class:`flask.Response` object
+    """
+
+    dumps = current_json_backend().dumps
+
+    return current_app.response_class(stream_with_context(_iter_json_array(items, serialize_item, dumps)),
+                                      mimetype=json_mimetype())
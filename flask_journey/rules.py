@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left
+
+
+def _blueprint_name(endpoint):
+    """Returns the name of the blueprint an endpoint belongs to, or None for app-level endpoints"""
+
+    name, dot, _ = endpoint.partition('.')
+    return name if dot else None
+
+
+def rules_by_blueprint(url_map):
+    """Returns the rules of a URL map grouped by the blueprint that registered them, in one pass without sorting
+
+    :param url_map: :class:`werkzeug.routing.Map`
+    :return: Dict of blueprint name -> list of :class:`werkzeug.routing.Rule`
+    """
+
+    rules = {}
+
+    for rule in url_map.iter_rules():
+        name = _blueprint_name(rule.endpoint)
+
+        if name is not None:
+            rules.setdefault(name, []).append(rule)
+
+    return rules
+
+
+class RuleIndex(object):
+    """Index over an app's URL rules, grouped by the blueprint that registered them and sorted by path,
+    making rules under a path prefix retrievable with a binary search instead of a scan of the URL map.
+
+    :param url_map: :class:`werkzeug.routing.Map` to index
+    """
+
+    def __init__(self, url_map):
+        rules = sorted(url_map.iter_rules(), key=lambda r: r.rule)
+        self._all = (rules, [r.rule for r in rules])
+        self._by_blueprint = {}
+
+        for rule in rules:
+            name = _blueprint_name(rule.endpoint)
+            bp_rules, bp_paths = self._by_blueprint.setdefault(name, ([], []))
+            bp_rules.append(rule)
+            bp_paths.append(rule.rule)
+
+    def rules(self, base_path, blueprint_name=None):
+        """Yields rules at or below `base_path`
+
+        :param base_path: Path prefix, matched on segment boundaries (/api/v1 doesn't match /api/v10)
+        :param blueprint_name: Only yield rules registered by this blueprint
+        """
+
+        if blueprint_name is None:
+            rules, paths = self._all
+        else:
+            rules, paths = self._by_blueprint.get(blueprint_name, ((), ()))
+
+        prefix_len = len(base_path)
+
+        for i in range(bisect_left(paths, base_path), len(paths)):
+            path = paths[i]
+
+            if not path.startswith(base_path):
+                break
+            elif base_path == '/' or len(path) == prefix_len or path[prefix_len] == '/':
+                yield rules[i]
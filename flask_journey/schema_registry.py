@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import weakref
+
+from collections import OrderedDict
+from marshmallow import fields
+
+from .exceptions import IncompatibleSchema
+
+ROLES = ('query', 'body', 'output')
+
+log = logging.getLogger(__name__)
+
+# Blueprint -> list of (endpoint, role, schema), recorded by `route` at decoration time
+_route_schemas = weakref.WeakKeyDictionary()
+
+
+def record_route_schemas(bp, endpoint, **schemas):
+    """Records the schemas of a route, for Journey to collect when the blueprint gets registered
+
+    :param bp: :class:`flask.Blueprint` the route belongs to
+    :param endpoint: Endpoint name, without the blueprint name
+    :param schemas: Role (query, body or output) -> :class:`marshmallow.Schema` object or None
+    """
+
+    records = _route_schemas.setdefault(bp, [])
+
+    for role in ROLES:
+        schema = schemas.get(role)
+
+        if schema is not None:
+            records.append(('{0}.{1}'.format(bp.name, endpoint), role, schema))
+
+
+def _nested_fields(field):
+    """Yields the fields contained by `field` (list items), including itself"""
+
+    yield field
+
+    # marshmallow 2 calls the item field of lists `container`, 3 `inner`
+    inner = getattr(field, 'container', None) or getattr(field, 'inner', None)
+
+    if isinstance(inner, fields.Field):
+        for nested in _nested_fields(inner):
+            yield nested
+
+
+def warm_schema(schema, seen=None):
+    """Resolves the nested schemas of `schema`, which marshmallow otherwise does on first use
+
+    :param schema: :class:`marshmallow.Schema` object
+    :param seen: ids of schemas already warmed
+    :raises:
+        - IncompatibleSchema if a nested schema can't be resolved
+    """
+
+    seen = set() if seen is None else seen
+
+    if id(schema) in seen:
+        return
+
+    seen.add(id(schema))
+
+    for name, field in schema.fields.items():
+        for nested in _nested_fields(field):
+            if not isinstance(nested, fields.Nested):
+                continue
+
+            try:
+                nested_schema = nested.schema
+            except Exception as err:
+                raise IncompatibleSchema('Failed to resolve nested schema of {0}.{1}: {2}'
+                                         .format(type(schema).__name__, name, err))
+
+            warm_schema(nested_schema, seen)
+
+
+def sample_schema(schema):
+    """Runs an empty load and dump through `schema`, so first-use costs don't land on the first request.
+    Empty samples failing validation or hooks is expected, errors are logged at debug level and never raised.
+    """
+
+    empty = [] if schema.many else {}
+
+    for name, sample in (('load', schema.load), ('dump', schema.dump)):
+        try:
+            sample(empty)
+        except Exception as err:
+            log.debug('Sample %s of %s failed: %r', name, type(schema).__name__, err)
+
+
+class SchemaEntry(object):
+    """A schema used by Journey routes
+
+    :param schema: :class:`marshmallow.Schema` object
+    """
+
+    __slots__ = ('schema', 'usages')
+
+    def __init__(self, schema):
+        self.schema = schema
+
+        # (endpoint, role) pairs
+        self.usages = []
+
+    @property
+    def endpoints(self):
+        """Returns the endpoints using the schema
+
+        :return: list
+        """
+
+        return sorted(set(endpoint for endpoint, _ in self.usages))
+
+    @property
+    def shared(self):
+        """Returns whether multiple routes use this schema instance
+
+        :return: bool
+        """
+
+        return len(self.endpoints) > 1
+
+    def __repr__(self):
+        return '<SchemaEntry {0} {1}>'.format(type(self.schema).__name__, self.endpoints)
+
+
+class SchemaRegistry(object):
+    """Schemas used by the routes of the blueprints Journey registered, one entry per schema instance
+
+    :param sample: Run an empty load and dump through each schema when it gets collected
+    """
+
+    def __init__(self, sample=False):
+        self.sample = sample
+        self._entries = OrderedDict()
+        self._endpoints = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries.values())
+
+    def collect(self, bp):
+        """Adds the schemas of a blueprint's routes and warms them
+
+        :param bp: :class:`flask.Blueprint` object
+        :raises:
+            - IncompatibleSchema if a nested schema can't be resolved
+        """
+
+        seen = set()
+
+        for endpoint, role, schema in _route_schemas.get(bp, ()):
+            entry = self._entries.get(id(schema))
+
+            if entry is None:
+                entry = self._entries[id(schema)] = SchemaEntry(schema)
+                warm_schema(schema, seen)
+
+                if self.sample:
+                    sample_schema(schema)
+
+            if (endpoint, role) not in entry.usages:
+                entry.usages.append((endpoint, role))
+                self._endpoints.setdefault(endpoint, {})[role] = schema
+
+    def for_endpoint(self, endpoint):
+        """Returns the schemas of a route
+
+        :param endpoint: Endpoint name, e.g. `users.get_many`
+        :return: dict of role (query, body or output) -> :class:`marshmallow.Schema` object
+        """
+
+        return dict(self._endpoints.get(endpoint, {}))
+
+    def shared(self):
+        """Returns the entries of schema instances used by multiple routes
+
+        :return: list of :class:`SchemaEntry`
+        """
+
+        return [entry for entry in self if entry.shared]
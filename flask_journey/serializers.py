@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+from marshmallow import Schema, fields, utils
+from marshmallow.compat import text_type
+
+missing = utils.missing
+
+
+def _serialize_integer(value, attr, obj):
+    return None if value is None else int(value)
+
+
+def _serialize_float(value, attr, obj):
+    return None if value is None else float(value)
+
+
+def _serialize_string(value, attr, obj):
+    if type(value) is text_type or value is None:
+        return value
+
+    return utils.ensure_text_type(value)
+
+
+def _serialize_raw(value, attr, obj):
+    return value
+
+
+def _value_serializer(field):
+    """Returns a function converting a pulled value the same way `field._serialize` would,
+    or None if the field has to go through the generic `Field.serialize` path.
+
+    :param field: :class:`marshmallow.fields.Field` instance
+    :return: function or None
+    """
+
+    field_type = type(field)
+
+    if (not field._CHECK_ATTRIBUTE or
+            field_type.serialize is not fields.Field.serialize or
+            field_type.get_value is not fields.Field.get_value):
+        return None
+
+    if field_type is fields.Integer and not field.as_string:
+        return _serialize_integer
+    elif field_type is fields.Float and not field.as_string:
+        return _serialize_float
+    elif field_type is fields.String:
+        return _serialize_string
+    elif field_type is fields.Field or field_type is fields.Raw:
+        return _serialize_raw
+
+    return field._serialize
+
+
+def _is_compilable(schema):
+    """Checks whether the schema's dump output depends on anything but its (fixed) fields
+
+    :param schema: :class:`marshmallow.Schema` instance
+    :return: bool
+    """
+
+    return not (
+        schema._has_processors or
+        schema.prefix or
+        schema.extra or
+        schema.opts.fields or
+        schema.opts.additional or
+        type(schema).get_attribute is not Schema.get_attribute or
+        getattr(schema, '__accessor__', None) is not None
+    )
+
+
+def _compile_item_serializer(schema):
+    """Builds a function serializing a single object with the schema's fields, see :func:`compile_serializer`
+
+    :param schema: :class:`marshmallow.Schema` instance
+    :return: function or None if the schema can't be compiled
+    """
+
+    if not _is_compilable(schema):
+        return None
+
+    accessor = schema.get_attribute
+    dict_class = schema.dict_class
+    plan = []
+
+    for name, field in schema.fields.items():
+        if getattr(field, 'load_only', False):
+            continue
+
+        attr = getattr(field, 'attribute', None) or name
+
+        plan.append((
+            field.dump_to or name,  # Output key
+            name,
+            attr,
+            '.' not in attr,  # Whether the value can be pulled directly from a dict
+            field,
+            _value_serializer(field),
+        ))
+
+    plan = tuple(plan)
+
+    def serialize_item(obj):
+        is_dict = type(obj) is dict
+        ret = dict_class()
+
+        for key, name, attr, plain, field, serialize_value in plan:
+            if serialize_value is None:
+                value = field.serialize(name, obj, accessor=accessor)
+            else:
+                if is_dict and plain and attr in obj:
+                    value = obj[attr]
+                else:
+                    value = utils.get_value(attr, obj, missing)
+
+                if value is missing:
+                    default = field.default
+                    value = default() if callable(default) else default
+                else:
+                    value = serialize_value(value, name, obj)
+
+            if value is not missing:
+                ret[key] = value
+
+        return ret
+
+    return serialize_item
+
+
+def compile_serializer(schema):
+    """Compiles a dump function for a `marshal_with` schema.
+
+    The returned function produces the same output as `schema.dump(obj).data`, but pulls and converts
+    common field types (Integer, Float, String, Raw) directly instead of going through marshmallow's
+    marshaller. Other fields are serialized individually with their own `serialize` method, and if
+    anything goes wrong, the whole object is handed to `schema.dump` to get identical output and errors.
+
+    :param schema: :class:`marshmallow.Schema` instance
+    :return: function taking the object(s) to serialize
+    """
+
+    def generic(obj):
+        return schema.dump(obj)[0]
+
+    serialize_item = _compile_item_serializer(schema)
+
+    if serialize_item is None:
+        return generic
+
+    if schema.many:
+        def serializer(obj):
+            if obj is None or not utils.is_iterable_but_not_string(obj):
+                return generic(obj)
+
+            items = list(obj)
+
+            try:
+                return [serialize_item(item) for item in items]
+            except Exception:
+                return generic(items)
+    else:
+        def serializer(obj):
+            try:
+                return serialize_item(obj)
+            except Exception:
+                return generic(obj)
+
+    return serializer
+
+
+def compile_item_serializer(schema):
+    """Compiles a function serializing one item at a time, regardless of `schema.many`.
+    Used when streaming collections, falls back to `schema.dump(item, many=False)` per item.
+
+    :param schema: :class:`marshmallow.Schema` instance
+    :return: function taking a single object to serialize
+    """
+
+    def generic(obj):
+        return schema.dump(obj, many=False)[0]
+
+    serialize_item = _compile_item_serializer(schema)
+
+    if serialize_item is None:
+        return generic
+
+    def serializer(obj):
+        try:
+            return serialize_item(obj)
+        except Exception:
+            return generic(obj)
+
+    return serializer
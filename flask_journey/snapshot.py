@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import hashlib
+import importlib.util
+
+from .blueprint_bundle import DeferredBundle
+from .records import RouteRecord
+
+# Bumped when the snapshot layout changes, invalidating snapshots written by other versions
+SNAPSHOT_VERSION = 1
+
+
+def _module_stat(module_name):
+    """Returns the mtime and size of a module's source file, without importing it if it isn't already
+
+    :param module_name: Dotted module name
+    :return: Tuple of mtime and size, or None if the module has no file
+    """
+
+    module = sys.modules.get(module_name)
+    filename = getattr(module, '__file__', None)
+
+    if module is None:
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except (ImportError, ValueError):
+            spec = None
+
+        filename = getattr(spec, 'origin', None)
+
+    try:
+        stat = os.stat(filename)
+    except (OSError, TypeError):
+        return None
+
+    return stat.st_mtime, stat.st_size
+
+
+def _describe_bundle(bundle, stat):
+    if isinstance(bundle, DeferredBundle):
+        return [bundle.path, bundle.import_name, stat(bundle.import_name.partition(':')[0])]
+
+    blueprints = [[bp.name, bp.import_name, bp.url_prefix, description, len(bp.deferred_functions),
+                   stat(bp.import_name)]
+                  for bp, description in bundle.blueprints]
+
+    return [bundle.path, bundle.description, bool(getattr(bundle, 'batch', False)), blueprints]
+
+
+def snapshot_key(journey_path, bundles):
+    """Returns a hash of bundle definitions, changing whenever the routes they register may have changed:
+    bundle and blueprint paths and names, number of rules and the mtime and size of the modules defining them
+
+    :param journey_path: Path prefixing all bundle paths
+    :param bundles: :class:`flask_journey.BlueprintBundle` or deferred bundle objects
+    :return: hex digest
+    """
+
+    stats = {}
+
+    def stat(module_name):
+        # Blueprints tend to share modules, stat each once
+        if module_name not in stats:
+            stats[module_name] = _module_stat(module_name)
+
+        return stats[module_name]
+
+    definitions = [SNAPSHOT_VERSION, journey_path] + [_describe_bundle(bundle, stat) for bundle in bundles]
+
+    return hashlib.sha1(json.dumps(definitions, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def write_snapshot(filename, key, bundles, dumps):
+    """Writes the route listings of registered bundles to a snapshot file. The file is replaced atomically,
+    workers reading it concurrently see either the old or new snapshot.
+
+    :param filename: Snapshot file path
+    :param key: :func:`snapshot_key` of the bundles
+    :param bundles: Route listing dicts, see :meth:`flask_journey.records.BundleRecord.as_dict`
+    :param dumps: Function encoding JSON to bytes or text
+    """
+
+    data = dumps({'version': SNAPSHOT_VERSION, 'key': key, 'bundles': list(bundles)})
+    tmp = '{0}.{1}.tmp'.format(filename, os.getpid())
+
+    with open(tmp, 'wb') as f:
+        f.write(data.encode('utf-8') if not isinstance(data, bytes) else data)
+
+    os.replace(tmp, filename)
+
+
+def read_snapshot(filename, key, loads):
+    """Reads a snapshot file
+
+    :param filename: Snapshot file path
+    :param key: Expected :func:`snapshot_key`
+    :param loads: Function decoding JSON bytes
+    :return: Dict of (bundle path, blueprint name) -> list of :class:`flask_journey.records.RouteRecord`, None if
+        the snapshot is missing, unreadable or was written for other bundle definitions
+    """
+
+    try:
+        with open(filename, 'rb') as f:
+            snapshot = loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION or snapshot.get('key') != key:
+        return None
+
+    try:
+        return dict(((bundle['path'], blueprint['name']),
+                     [RouteRecord.create(route['path'], route['endpoint'], route['methods'])
+                      for route in blueprint['routes']])
+                    for bundle in snapshot['bundles'] for blueprint in bundle['blueprints'])
+    except (KeyError, TypeError):
+        return None
+
+
+def snapshot_matches(routes, base_path, rules):
+    """Checks snapshot routes of a blueprint against the rules it registered. The snapshot key only covers the
+    modules defining blueprints, rules declared elsewhere can change without changing it.
+
+    :param routes: :class:`flask_journey.records.RouteRecord` of the blueprint read from a snapshot
+    :param base_path: Path the blueprint was registered at
+    :param rules: :class:`werkzeug.routing.Rule` objects registered by the blueprint
+    :return: bool, whether the routes have the same paths, endpoints and methods as the rules
+    """
+
+    methods = dict(((rule.rule, rule.endpoint), rule.methods) for rule in rules)
+
+    return len(methods) == len(routes) and all(methods.get((base_path + route.path, route.endpoint)) == route.methods
+                                               for route in routes)
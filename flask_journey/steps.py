@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+from flask import current_app, request
+
+from .backends import current_json_backend
+from .responses import request_json_bytes, decode_json, json_response, encoded_json_response, stream_json_array
+from .response_cache import current_response_cache
+from .conditional import is_not_modified, not_modified_response, conditional_json_response
+from .compression import compress_response
+
+
+class ViewState(object):
+    """Conditional request and cache state of a request, from :meth:`RouteSteps.before_view` to
+    :meth:`RouteSteps.after_view`"""
+
+    __slots__ = ('conditional', 'version', 'cache', 'cache_key')
+
+    def __init__(self, conditional=False, version=None, cache=None, cache_key=None):
+        self.conditional = conditional
+        self.version = version
+        self.cache = cache
+        self.cache_key = cache_key
+
+
+class RouteSteps(object):
+    """The steps `route` takes around a view, shared by the wrappers of plain and coroutine function views,
+    which only differ in how they call them. See :func:`flask_journey.utils.route` for the parameters.
+
+    :param query: Bound `_query` schema or None
+    :param query_decoder: :class:`flask_journey.loaders.QueryDecoder` of the query schema
+    :param body: Bound `_body` schema or None
+    :param body_pool_threshold: Load bodies larger than this many bytes in the body pool, never if None
+    :param serializer: Compiled `marshal_with` serializer, of single items if streaming, or None
+    :param stream: Stream the output as a JSON array
+    :param stream_body: Pass `_body` as a generator of items parsed from the request stream
+    :param cache: bool, cache encoded GET responses
+    :param route_cache: Route specific :class:`flask_journey.response_cache.ResponseCache`
+    :param cache_ttl: Seconds cached responses are kept
+    :param etag: True or a version token function, to answer conditional GET requests
+    :param compression: :class:`flask_journey.compression.Compression` settings of the route
+    """
+
+    def __init__(self, query, query_decoder, body, body_pool_threshold, serializer, stream, stream_body=False,
+                 cache=False, route_cache=None, cache_ttl=None, etag=False, compression=None):
+        self.query = query
+        self.query_decoder = query_decoder
+        self.body = body
+        self.body_pool_threshold = body_pool_threshold
+        self.serializer = serializer
+        self.stream = stream
+        self.stream_body = stream_body
+        self.cache = cache
+        self.route_cache = route_cache
+        self.cache_ttl = cache_ttl
+        self.etag = etag
+        self.compression = compression
+
+    def query_data(self):
+        """Returns the query string decoded for loading into the query schema
+
+        :return: dict
+        """
+
+        return self.query_decoder.decode(request.args, request.query_string)
+
+    @staticmethod
+    def body_bytes():
+        """Returns the raw JSON body of the request
+
+        :return: bytes or None
+        """
+
+        return request_json_bytes()
+
+    def pooled(self, raw):
+        """Returns whether a body gets loaded in the body pool
+
+        :param raw: Raw JSON body, see :meth:`body_bytes`
+        :return: bool
+        """
+
+        return raw is not None and self.body_pool_threshold is not None and len(raw) > self.body_pool_threshold
+
+    @staticmethod
+    def body_data(backend, raw):
+        """Decodes a JSON body for loading into the body schema
+
+        :param backend: :class:`flask_journey.backends.JSONBackend` to decode with
+        :param raw: Raw JSON body, see :meth:`body_bytes`
+        :return: Decoded object, an empty dict for empty bodies so they get picked up by the validator
+        :raises:
+            - BadRequest if the body isn't valid JSON
+        """
+
+        data = decode_json(backend, raw) if raw is not None else None
+
+        return data if data is not None else {}
+
+    @staticmethod
+    def invalid(timer, err):
+        """Answers a request failing validation
+
+        :param timer: :class:`flask_journey.metrics.RequestTimer` of the request
+        :param err: :class:`marshmallow.ValidationError`
+        :return: 422 response
+        """
+
+        timer.finish(validation_failed=True)
+        return json_response(err.messages, 422)
+
+    def before_view(self, timer, view_kwargs):
+        """Answers conditional requests with a matching version token, and cached requests from the cache
+
+        :param timer: :class:`flask_journey.metrics.RequestTimer` of the request
+        :param view_kwargs: kwargs the view is called with, including loaded `_query` and `_body`
+        :return: Tuple of :class:`ViewState` and a response, or None if the view needs to be called
+        """
+
+        state = ViewState()
+
+        if request.method not in ('GET', 'HEAD'):
+            return state, None
+
+        if self.etag:
+            state.conditional = True
+            version = self.etag(**view_kwargs) if callable(self.etag) else None
+
+            if version is not None:
+                state.version = version = str(version)
+
+                if is_not_modified(version):
+                    timer.finish()
+                    return state, self._compress(state, not_modified_response(version))
+
+        if self.cache:
+            state.cache = self.route_cache if self.route_cache is not None else current_response_cache()
+            state.cache_key = state.cache.key(request.endpoint, request.view_args,
+                                              view_kwargs['_query'].data if self.query is not None else None,
+                                              state.version)
+            cached = state.cache.get(state.cache_key)
+
+            if cached is not None:
+                timer.finish()
+                return state, self._compress(state, self._encoded_response(state, cached))
+
+        return state, None
+
+    def serialize(self, result):
+        """Serializes the view's output with the `marshal_with` schema, unless it gets streamed
+
+        :param result: Return value of the view
+        :return: Serialized output, or `result` if there's nothing to serialize
+        """
+
+        if self.stream or self.serializer is None:
+            return result
+
+        return self.serializer(result)
+
+    def after_view(self, state, output):
+        """Creates the response, storing its encoded body in the cache and compressing it if enabled
+
+        :param state: :class:`ViewState` from :meth:`before_view`
+        :param output: Serialized output, see :meth:`serialize`
+        :return: Response or the view's return value
+        """
+
+        if self.stream:
+            return stream_json_array(output, self.serializer)
+
+        if state.cache_key is not None or state.conditional:
+            data = current_json_backend().dumps(output)
+
+            if state.cache_key is not None:
+                state.cache.set(state.cache_key, data, self.cache_ttl)
+
+            response = self._encoded_response(state, data)
+        elif self.serializer is not None:
+            response = json_response(output)
+        else:
+            response = output
+
+        return self._compress(state, response)
+
+    @staticmethod
+    def _encoded_response(state, data):
+        if state.conditional:
+            return conditional_json_response(data, state.version)
+
+        return encoded_json_response(data)
+
+    def _compress(self, state, response):
+        if self.compression is None:
+            return response
+
+        return compress_response(current_app.make_response(response), self.compression, state.cache,
+                                 state.cache_key, self.cache_ttl)
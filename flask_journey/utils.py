@@ -1,35 +1,24 @@
 # -*- coding: utf-8 -*-
 
-import re
+import inspect
 
 from functools import wraps
-from flask import jsonify, request
 from marshmallow import ValidationError, Schema
-from furl import furl
 
-from .exceptions import IncompatibleSchema, InvalidPath
-
-
-def sanitize_path(path):
-    """Performs sanitation of the path after validating
-
-    :param path: path to sanitize
-    :return: path
-    :raises:
-        - InvalidPath if the path doesn't start with a slash
-    """
-
-    if path == '/':  # Nothing to do, just return
-        return path
-
-    if path[:1] != '/':
-        raise InvalidPath('The path must start with a slash')
-
-    # Deduplicate slashes in path
-    path = re.sub(r'/+', '/', path)
-
-    # Strip trailing slashes and return
-    return path.rstrip('/')
+from .exceptions import IncompatibleSchema
+from .paths import sanitize_path  # noqa: F401, importable from here for compatibility
+from .loaders import QueryDecoder, bind_schema
+from .serializers import compile_serializer, compile_item_serializer
+from .backends import current_json_backend
+from .metrics import start_timer
+from .pool import ensure_picklable, submit_body_load, body_load_result
+from .parsers import stream_body_items
+from .cache import CacheBackend
+from .response_cache import ResponseCache, VIEW_ATTRIBUTE
+from .compression import get_compression
+from .schema_registry import record_route_schemas
+from .steps import RouteSteps
+from ._async import wrap_async
 
 
 def _validate_schema(obj):
@@ -57,11 +46,35 @@ def route(bp, *args, **kwargs):
     :param kwargs:
         - :strict_slashes: Enable / disable strict slashes (default False)
         - :validate: Enable / disable body/query validation (default True)
-        - :_query: Unmarshal Query string into this schema
+        - :_query: Unmarshal Query string into this schema, keys of `fields.List` fields receive all their values
         - :_body: Unmarshal JSON body into this schema
-        - :marshal_with: Serialize the output with this schema
+        - :marshal_with: Serialize the output with this schema, using a serializer compiled at decoration time
+        - :stream: Stream the `marshal_with` output as a JSON array, one item at a time (requires many=True)
+        - :stream_body: Parse the body (a JSON array, or NDJSON if sent as application/x-ndjson) incrementally
+            and pass `_body` to the view as a generator of loaded items (requires a many=True `_body` schema).
+            Items failing validation while the view consumes them result in a 422 keyed by item index
+        - :body_pool_threshold: Decode and validate JSON bodies larger than this many bytes in the Journey body
+            pool (a process pool by default) instead of holding the GIL in the request thread. Requires a
+            picklable `_body` schema (default None, never)
+        - :cache: Cache the encoded output of GET requests, keyed on endpoint, view args and validated `_query`
+            data. True for the Journey response cache, or a :class:`flask_journey.cache.CacheBackend` for a route
+            specific one. Invalidate with :func:`flask_journey.invalidate_cache`, which reaches route specific
+            caches too (default False)
+        - :cache_ttl: Seconds cached responses are kept (default None, the cache backend's default)
+        - :etag: Set an `ETag` on GET responses and answer matching `If-None-Match` requests with 304. True for a
+            hash of the encoded output, or a function called with the view's kwargs before the view, returning a
+            version token of the resource (or None to fall back to hashing). Matching tokens skip the view and
+            serialization, and are part of the cache key if caching (default False)
+        - :compress: Compress the output with gzip or brotli, as negotiated with `Accept-Encoding`. True for the
+            default settings or a :class:`flask_journey.compression.Compression` object. Compressed bodies of
+            cached responses are cached too (default False)
+        - :offload: For `async def` views, run decoding, validation and serialization in the event loop's
+            default executor instead of blocking the loop (default False)
     :raises:
         - ValidationError if the query parameters or JSON body fails validation
+        - IncompatibleSchema if streaming is enabled without a many=True marshal_with / `_body` schema, if caching
+            or ETags are enabled without a marshal_with schema or with streaming, or if a `_body` schema loaded in
+            the body pool can't be pickled
     """
 
     kwargs['strict_slashes'] = kwargs.pop('strict_slashes', False)
@@ -69,38 +82,120 @@ def route(bp, *args, **kwargs):
     query = _validate_schema(kwargs.pop('_query', None))
     output = _validate_schema(kwargs.pop('marshal_with', None))
     validate = kwargs.pop('validate', True)
+    stream = kwargs.pop('stream', False)
+    offload = kwargs.pop('offload', False)
+    body_pool_threshold = kwargs.pop('body_pool_threshold', None)
+    stream_body = kwargs.pop('stream_body', False)
+    cache = kwargs.pop('cache', False)
+
+    # Cache backends may define __len__, an empty one must still enable caching
+    cache_enabled = cache is True or isinstance(cache, CacheBackend)
+    cache_ttl = kwargs.pop('cache_ttl', None)
+    etag = kwargs.pop('etag', False)
+    compression = get_compression(kwargs.pop('compress', False))
+
+    if stream and (output is None or not output.many):
+        raise IncompatibleSchema('Streaming requires a marshal_with schema with many=True')
+
+    if stream_body and (body is None or not body.many):
+        raise IncompatibleSchema('Body streaming requires a _body schema with many=True')
+
+    if cache_enabled and (output is None or stream):
+        raise IncompatibleSchema('Caching requires a marshal_with schema and no streaming')
+
+    if etag and (output is None or stream):
+        raise IncompatibleSchema('ETags require a marshal_with schema and no streaming')
+
+    # Route specific cache, the Journey response cache is looked up per request otherwise
+    route_cache = ResponseCache(cache) if isinstance(cache, CacheBackend) else None
+
+    # The schemas as passed, for the Journey schema registry
+    schemas = {'query': query, 'body': body, 'output': output}
+
+    if query is not None:
+        query = bind_schema(query, validate)
+
+    if body is not None:
+        body = bind_schema(body, validate)
+
+        if body_pool_threshold is not None and not stream_body:
+            ensure_picklable(body)
+
+    query_decoder = QueryDecoder(query) if query is not None else None
+
+    if stream:
+        serializer = compile_item_serializer(output)
+    elif output is not None:
+        serializer = compile_serializer(output)
+    else:
+        serializer = None
+
+    steps = RouteSteps(query, query_decoder, body, body_pool_threshold, serializer, stream, stream_body,
+                       cache_enabled, route_cache, cache_ttl, etag, compression)
 
     def decorator(f):
+        record_route_schemas(bp, kwargs.get('endpoint') or f.__name__, **schemas)
+
+        if inspect.iscoroutinefunction(f):
+            view = wraps(f)(wrap_async(f, steps, offload))
+            setattr(view, VIEW_ATTRIBUTE, route_cache)
+            bp.route(*args, **kwargs)(view)
+            return f
+
         @bp.route(*args, **kwargs)
         @wraps(f)
         def wrapper(*inner_args, **inner_kwargs):
             """If a schema (_body and/or _query) was supplied to the route decorator, the deserialized
             :class`marshmallow.Schema` object is injected into the decorated function's kwargs."""
 
+            timer = start_timer()
+
             try:
                 if query is not None:
-                    query.strict = validate
-                    url = furl(request.url)
-                    inner_kwargs['_query'] = query.load(data=url.args)
+                    inner_kwargs['_query'] = query.load(data=steps.query_data())
+                    timer.mark('query')
+
+                if stream_body:
+                    # Items are parsed and validated as the view consumes them
+                    inner_kwargs['_body'] = stream_body_items(body)
+                    timer.mark('body')
+                elif body is not None:
+                    raw = steps.body_bytes()
+
+                    if steps.pooled(raw):
+                        inner_kwargs['_body'] = body_load_result(submit_body_load(body, raw).result())
+                    else:
+                        inner_kwargs['_body'] = body.load(data=steps.body_data(current_json_backend(), raw))
+
+                    timer.mark('body')
 
-                if body is not None:
-                    body.strict = validate
-                    json_data = request.get_json()
+            except ValidationError as err:
+                return steps.invalid(timer, err)
 
-                    if json_data is None:
-                        # Set json_data to empty dict if body is empty, so it gets picked up by the validator
-                        json_data = {}
+            state, response = steps.before_view(timer, inner_kwargs)
 
-                    inner_kwargs['_body'] = body.load(data=json_data)
+            if response is not None:
+                return response
 
+            try:
+                result = f(*inner_args, **inner_kwargs)
             except ValidationError as err:
-                return jsonify(err.messages), 422
+                if not stream_body:
+                    raise
+
+                return steps.invalid(timer, err)
+            finally:
+                # Also counts requests whose view raised
+                timer.finish()
+
+            timer.mark('handler')
+            result = steps.after_view(state, steps.serialize(result))
+            timer.mark('serialize')
 
-            if output:
-                data = output.dump(f(*inner_args, **inner_kwargs))
-                return jsonify(data[0])
+            return result
 
-            return f(*inner_args, **inner_kwargs)
+        # Lets `invalidate_cache` find the route specific cache by endpoint
+        setattr(wrapper, VIEW_ATTRIBUTE, route_cache)
 
         return f
 
@@ -47,18 +47,31 @@ with io.open('README.rst') as readme:
         zip_safe=False,
         include_package_data=True,
         platforms='any',
+        python_requires='>=3.8',
         install_requires=[
             'Flask',
             'marshmallow',
-            'furl',
             'Flask-Sphinx-Themes',
         ],
+        extras_require={
+            'orjson': ['orjson'],
+            'ujson': ['ujson'],
+            'async': ['asgiref'],
+            'brotli': ['brotli'],
+        },
         classifiers=[
             'Environment :: Web Environment',
             'Intended Audience :: Developers',
             'License :: OSI Approved :: BSD License',
             'Operating System :: OS Independent',
             'Programming Language :: Python',
+            'Programming Language :: Python :: 3',
+            'Programming Language :: Python :: 3 :: Only',
+            'Programming Language :: Python :: 3.8',
+            'Programming Language :: Python :: 3.9',
+            'Programming Language :: Python :: 3.10',
+            'Programming Language :: Python :: 3.11',
+            'Programming Language :: Python :: 3.12',
             'Topic :: Internet :: WWW/HTTP :: Dynamic Content',
             'Topic :: Software Development :: Libraries :: Python Modules'
         ]
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import json
+import asyncio
+
+from unittest import TestCase, skipIf
+from flask import Flask, Blueprint
+from flask_journey import route
+from marshmallow import Schema, fields
+
+try:
+    import asgiref
+except ImportError:
+    asgiref = None
+
+
+class QuerySchema(Schema):
+    p1 = fields.Integer(required=True)
+
+
+class BodySchema(Schema):
+    id = fields.Integer(required=True)
+    name = fields.String(required=True)
+
+
+@skipIf(asgiref is None, 'Async views require asgiref')
+class AsyncRouteTestCase(TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        app.config['TESTING'] = True
+
+        self.app = app
+        self.client = app.test_client()
+
+    def register(self, **kwargs):
+        bp = Blueprint('test', __name__)
+
+        @route(bp, '/test', methods=['POST'], _query=QuerySchema(), _body=BodySchema(many=True),
+               marshal_with=BodySchema(many=True), **kwargs)
+        async def create(_query, _body):
+            await asyncio.sleep(0)
+            return [dict(item, id=item['id'] * _query.data['p1']) for item in _body.data]
+
+        self.app.register_blueprint(bp)
+
+    def test_async_view(self):
+        """Coroutine function views should get validated input and marshalled output"""
+
+        self.register()
+        payload = [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}]
+
+        response = self.client.post('/test?p1=10', data=json.dumps(payload), content_type='application/json')
+
+        self.assertEqual(json.loads(response.get_data(as_text=True)), [{'id': 10, 'name': 'a'}, {'id': 20, 'name': 'b'}])
+
+        response = self.client.post('/test?p1=invalid', data=json.dumps(payload), content_type='application/json')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertTrue('p1' in json.loads(response.get_data(as_text=True)))
+
+    def test_async_view_offload(self):
+        """Offloaded schema work should produce the same results"""
+
+        self.register(offload=True)
+        payload = [{'id': 1, 'name': 'a'}]
+
+        response = self.client.post('/test?p1=2', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(json.loads(response.get_data(as_text=True)), [{'id': 2, 'name': 'a'}])
+
+        response = self.client.post('/test?p1=2', data=json.dumps([{'id': 'x'}]), content_type='application/json')
+        self.assertEqual(response.status_code, 422)
+
+        response = self.client.post('/test?p1=2', data='{invalid', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -2,7 +2,7 @@
 
 from unittest import TestCase
 from flask import Blueprint
-from flask_journey import BlueprintBundle, InvalidPath, InvalidBlueprint
+from flask_journey import BlueprintBundle, InvalidPath, InvalidBlueprint, ConflictingBlueprint
 
 
 class BundleTestCase(TestCase):
@@ -87,3 +87,32 @@ class BundleTestCase(TestCase):
         self.assertRaises(InvalidBlueprint, bpb.attach_bp, object())
         self.assertRaises(InvalidBlueprint, bpb.attach_bp, None)
 
+    def test_attach_duplicate_blueprint(self):
+        """Attaching a blueprint with the name of an attached one should raise ConflictingBlueprint"""
+
+        bpb = BlueprintBundle(path='/test')
+        bpb.attach_bp(Blueprint('bp1', __name__))
+
+        self.assertRaises(ConflictingBlueprint, bpb.attach_bp, Blueprint('bp1', __name__))
+
+    def test_detach_blueprint(self):
+        """Detached blueprints should be removed from the bundle, order of the others kept"""
+
+        bp1 = Blueprint('bp1', __name__)
+        bp2 = Blueprint('bp2', __name__)
+        bp3 = Blueprint('bp3', __name__)
+
+        bpb = BlueprintBundle(path='/test')
+        bpb.attach_bp(bp1)
+        bpb.attach_bp(bp2, 'second')
+        bpb.attach_bp(bp3)
+
+        self.assertTrue(bp2 in bpb.blueprints)
+        self.assertTrue('bp2' in bpb.blueprints)
+        self.assertFalse(Blueprint('bp2', __name__) in bpb.blueprints)
+
+        self.assertTrue(bpb.detach_bp('bp2') is bp2)
+        self.assertFalse(bp2 in bpb.blueprints)
+        self.assertEqual([bp for bp, _ in bpb.blueprints], [bp1, bp3])
+        self.assertEqual(len(bpb.blueprints), 2)
+        self.assertRaises(KeyError, bpb.detach_bp, 'bp2')
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+from werkzeug.datastructures import MultiDict
+from marshmallow import Schema, fields
+
+from flask_journey.cache import LRUCache, LocalCache
+from flask_journey.loaders import QueryDecoder
+
+
+class QuerySchema(Schema):
+    ids = fields.List(fields.Integer())
+    name = fields.String()
+
+
+class LRUCacheTestCase(TestCase):
+    def test_get_set(self):
+        """Stored values should be returned, missing keys should return the default"""
+
+        cache = LRUCache(2)
+        cache.set('a', 1)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('b', 'default'), 'default')
+
+    def test_evict_least_recently_used(self):
+        """The least recently used entry should be evicted when the cache is full"""
+
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertTrue('a' in cache)
+        self.assertFalse('b' in cache)
+        self.assertTrue('c' in cache)
+        self.assertEqual(len(cache), 2)
+
+
+class QueryDecoderTestCase(TestCase):
+    def test_decode(self):
+        """List fields should get every value, other fields the first one"""
+
+        decoder = QueryDecoder(QuerySchema())
+        args = MultiDict([('ids', '1'), ('ids', '2'), ('name', 'a'), ('name', 'b')])
+
+        self.assertEqual(decoder.decode(args, b'ids=1&ids=2&name=a&name=b'), {'ids': ('1', '2'), 'name': 'a'})
+
+    def test_decode_cached(self):
+        """Identical query strings should be decoded once"""
+
+        decoder = QueryDecoder(QuerySchema())
+        first = decoder.decode(MultiDict([('name', 'a')]), b'name=a')
+        second = decoder.decode(MultiDict([('name', 'a')]), b'name=a')
+
+        self.assertTrue(first is second)
+
+
+class LocalCacheTestCase(TestCase):
+    def test_ttl(self):
+        """Entries should expire after their TTL, a TTL of 0 should never expire"""
+
+        cache = LocalCache(ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2, ttl=0)
+        cache.set('c', 3, ttl=-1)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('b'), 2)
+        self.assertEqual(cache.get('c'), None)
+        self.assertEqual(len(cache), 2)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import json
+import threading
+
+from unittest import TestCase
+from flask import Flask, Blueprint
+from flask_journey import route
+from marshmallow import Schema, fields, validate
+
+
+class QuerySchema(Schema):
+    p1 = fields.Integer(required=True, validate=validate.Range(min=2, max=8))
+
+
+class BodySchema(Schema):
+    p1 = fields.Integer(required=True)
+
+
+query = QuerySchema()
+body = BodySchema()
+
+
+class ConcurrencyTestCase(TestCase):
+    threads = 8
+    requests_per_thread = 250
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.config['TESTING'] = True
+        app.logger.disabled = True
+
+        bp = Blueprint('test', __name__)
+
+        # Strict and non-strict routes sharing the same schema instances
+        @route(bp, '/strict', methods=['POST'], _query=query, _body=body)
+        def strict(_query, _body):
+            return json.dumps({'errors': False})
+
+        @route(bp, '/lenient', methods=['POST'], _query=query, _body=body, validate=False)
+        def lenient(_query, _body):
+            return json.dumps({'errors': bool(_query.errors or _body.errors)})
+
+        app.register_blueprint(bp)
+        self.app = app
+
+    def test_mixed_strictness(self):
+        """Routes with different `validate` settings sharing schemas should not affect each other across threads"""
+
+        failures = []
+
+        def worker(seed):
+            client = self.app.test_client()
+
+            for i in range(self.requests_per_thread):
+                is_strict = (seed + i) % 2 == 0
+                response = client.post('/strict?p1=1' if is_strict else '/lenient?p1=1',
+                                       data=json.dumps({'p1': 'invalid'}),
+                                       content_type='application/json')
+
+                if is_strict and response.status_code != 422:
+                    failures.append(('strict', response.status_code))
+                elif not is_strict and (response.status_code != 200 or
+                                        not json.loads(response.get_data(as_text=True))['errors']):
+                    failures.append(('lenient', response.status_code))
+
+        workers = [threading.Thread(target=worker, args=(n, )) for n in range(self.threads)]
+
+        for t in workers:
+            t.start()
+
+        for t in workers:
+            t.join()
+
+        self.assertEqual(failures, [])
+        self.assertFalse(query.strict)
+        self.assertFalse(body.strict)
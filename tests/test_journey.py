@@ -1,12 +1,21 @@
 # -*- coding: utf-8 -*-
 
+import os
+import sys
+import json
+import types
+import shutil
+import tempfile
+
 from unittest import TestCase
-from flask import Flask, Blueprint
+from flask import Flask, Blueprint, current_app, jsonify
+from marshmallow import Schema, fields, post_load, pre_dump
 from flask_journey import (
     BlueprintBundle, Journey, NoBundlesAttached,
     MissingBlueprints, InvalidBundlesType, IncompatibleBundle,
-    ConflictingPath
+    ConflictingPath, InvalidJSONBackend, IncompatibleSchema, route
 )
+from flask_journey.backends import BACKENDS
 
 
 class FlaskTestCase(TestCase):
@@ -172,6 +181,17 @@ class FlaskTestCase(TestCase):
         self.assertEqual(regged_bpb['path'], bpb_path)
         self.assertEqual(regged_bp['path'], expected_bp_path)
         self.assertEqual(regged_bp_route['path'], bp_route_path)
+        self.assertTrue('path' in regged_bp_route)
+
+        with self.app.app_context():
+            listing = json.loads(jsonify(j.routes_detailed).get_data(as_text=True))
+
+        self.assertEqual(listing[0]['blueprints'][0]['routes'][0]['path'], bp_route_path)
+        self.assertEqual(sorted(listing[0]['blueprints'][0]['routes'][0]['methods']), ['GET', 'HEAD', 'OPTIONS'])
+
+        routes = Journey.get_blueprint_routes(self.app, bpb_path + expected_bp_path, bp_name)
+        self.assertEqual(routes[0]['path'], bp_route_path)
+        self.assertEqual(sorted(routes[0]['methods']), ['GET', 'HEAD', 'OPTIONS'])
 
     def test_routes_simple(self):
         """The Journey.routes_simple property should return one (endpoint, route, methods) per route"""
@@ -199,6 +219,132 @@ class FlaskTestCase(TestCase):
         self.assertEqual(j.routes_simple[0][0], expected_endpoint_name)
         self.assertEqual(j.routes_simple[0][1], expected_route_path)
 
+    def test_routes_views_cached(self):
+        """Route views should be built once and rebuilt when bundles get registered"""
+
+        bp = Blueprint('test', __name__)
+
+        @bp.route('/route')
+        def test_route():
+            return None
+
+        bpb = BlueprintBundle('/api/test')
+        bpb.attach_bp(bp)
+        j = Journey()
+        j.attach_bundle(bpb)
+        j.init_app(self.app)
+
+        routes_simple = j.routes_simple
+
+        self.assertTrue(j.routes_simple is routes_simple)
+        self.assertTrue(j.routes_json is j.routes_json)
+        self.assertEqual(json.loads(j.routes_json.decode('utf-8'))[0]['path'], '/api/test')
+
+        j.init_app(Flask(__name__))
+
+        # Views of the app initialized last, the first app keeps its own
+        self.assertFalse(j.routes_simple is routes_simple)
+        self.assertEqual(len(j.routes_simple), 1)
+
+        with self.app.app_context():
+            self.assertTrue(j.routes_simple is routes_simple)
+
+    def test_app_factory(self):
+        """One Journey should serve many apps, replaying its plan without extracting routes again"""
+
+        bp = Blueprint('items', __name__)
+
+        @bp.route('/<int:item_id>')
+        def get_one(item_id):
+            return str(item_id)
+
+        bpb = BlueprintBundle('/api/v1', batch=True)
+        bpb.attach_bp(bp)
+
+        j = Journey()
+        j.attach_bundle(bpb)
+
+        def create_app():
+            app = Flask(__name__)
+            j.init_app(app)
+            return app
+
+        app1 = create_app()
+        app2 = create_app()
+
+        with app1.app_context():
+            detailed = j.routes_detailed
+            simple = j.routes_simple
+
+        with app2.app_context():
+            self.assertEqual(j.routes_simple, simple)
+            self.assertEqual(j.routes_detailed, detailed)
+            self.assertTrue(app2.extensions['journey_state'].registered_bundles[0] is
+                            app1.extensions['journey_state'].registered_bundles[0])
+
+        self.assertTrue(j.plan is app2.extensions['journey_state'].plan)
+        self.assertEqual(app2.test_client().get('/api/v1/items/1').get_data(as_text=True), '1')
+        self.assertEqual(app2.test_client().post('/api/v1/_batch/', json=[]).status_code, 200)
+        self.assertEqual(j.resolve('/api/v1/items/1').endpoint, 'items.get_one')
+
+    def test_app_factory_response_cache(self):
+        """Apps created by the same factory should each get their own response cache"""
+
+        bp = Blueprint('tenant', __name__)
+
+        class TenantSchema(Schema):
+            name = fields.String()
+
+        @route(bp, '/', marshal_with=TenantSchema(), cache=True)
+        def get_tenant():
+            return {'name': current_app.config['TENANT']}
+
+        bpb = BlueprintBundle('/api')
+        bpb.attach_bp(bp)
+
+        j = Journey()
+        j.attach_bundle(bpb)
+
+        apps = []
+
+        for tenant in ('first', 'second'):
+            app = Flask(__name__)
+            app.config['TENANT'] = tenant
+            j.init_app(app)
+            apps.append(app)
+
+        self.assertFalse(apps[0].extensions['journey_state'].response_cache is
+                         apps[1].extensions['journey_state'].response_cache)
+
+        for app in apps + apps:
+            body = json.loads(app.test_client().get('/api/tenant/').get_data(as_text=True))
+            self.assertEqual(body['name'], app.config['TENANT'])
+
+            with app.app_context():
+                self.assertTrue(j.response_cache is app.extensions['journey_state'].response_cache)
+
+    def test_plan_rebuilt(self):
+        """Attaching bundles after initializing an app should only affect apps initialized afterwards"""
+
+        self.bundle.attach_bp(self.blueprint)
+        other = BlueprintBundle('/other')
+        other.attach_bp(Blueprint('other', __name__))
+
+        j = Journey()
+        j.attach_bundle(self.bundle)
+        j.init_app(self.app)
+        plan = j.plan
+
+        j.attach_bundle(other)
+        app = Flask(__name__)
+        j.init_app(app)
+
+        self.assertFalse(j.plan is plan)
+        self.assertEqual([bundle['path'] for bundle in j.routes_detailed], [self.bundle.path, '/other'])
+
+        with self.app.app_context():
+            self.assertEqual([bundle['path'] for bundle in j.routes_detailed], [self.bundle.path])
+
     def test_no_bundles(self):
         """Attempting to initialize Journey without bundles should raise NoBundlesAttached"""
 
@@ -298,3 +444,473 @@ class FlaskTestCase(TestCase):
 
         self.assertTrue(matched_blueprint)
 
+    def test_routes_prefix_attribution(self):
+        """Routes of a blueprint at a path that extends another blueprint's path should only be attributed to
+        the blueprint that registered them"""
+
+        bp1 = Blueprint('things', __name__)
+        bp2 = Blueprint('things2', __name__)
+
+        @bp1.route('/a')
+        def route_a():
+            return ''
+
+        @bp2.route('/b')
+        def route_b():
+            return ''
+
+        bpb1 = BlueprintBundle('/api/v1')
+        bpb1.attach_bp(bp1)
+        bpb1.attach_bp(bp2)
+
+        bpb2 = BlueprintBundle('/api/v10')
+        bpb2.attach_bp(Blueprint('other', __name__, url_prefix='/things'))
+
+        j = Journey(self.app, bundles=[bpb1, bpb2])
+
+        things, things2 = j.routes_detailed[0]['blueprints']
+
+        self.assertEqual([r['endpoint'] for r in things['routes']], ['things.route_a'])
+        self.assertEqual([r['endpoint'] for r in things2['routes']], ['things2.route_b'])
+        self.assertEqual(j.routes_detailed[1]['blueprints'][0]['routes'], [])
+
+    def test_lazy(self):
+        """Lazily registered bundles should be imported and registered before the first request"""
+
+        bp1 = Blueprint('bp1', __name__)
+        bp2 = Blueprint('bp2', __name__)
+
+        @bp1.route('/route')
+        def route1():
+            return 'bp1'
+
+        @bp2.route('/route')
+        def route2():
+            return 'bp2'
+
+        bpb1 = BlueprintBundle('/api/v1')
+        bpb1.attach_bp(bp1)
+
+        module = types.ModuleType('journey_test_bundles')
+        sys.modules[module.__name__] = module
+        self.addCleanup(sys.modules.pop, module.__name__)
+
+        j = Journey()
+        j.attach_bundle(bpb1)
+        j.attach_deferred('/api/v2', 'journey_test_bundles:v2')
+        j.init_app(self.app, lazy=True)
+
+        self.assertEqual(j.routes_simple, ())
+
+        # The deferred bundle isn't imported until the first request
+        module.v2 = BlueprintBundle('/api/v2')
+        module.v2.attach_bp(bp2)
+
+        client = self.app.test_client()
+
+        self.assertEqual(client.get('/api/v2/bp2/route').get_data(as_text=True), 'bp2')
+        self.assertEqual(client.get('/api/v1/bp1/route').get_data(as_text=True), 'bp1')
+        self.assertEqual(len(j.routes_simple), 2)
+        self.assertEqual(j._pending_bundles, [])
+
+    def test_lazy_concurrent(self):
+        """Concurrent first requests should wait until all lazily registered bundles are in"""
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        bpb = BlueprintBundle('/api/v1')
+
+        for i in range(20):
+            bp = Blueprint('bp{0}'.format(i), __name__)
+            bp.add_url_rule('/route', 'route', lambda: 'ok')
+            bpb.attach_bp(bp)
+
+        j = Journey(lazy=True)
+        j.attach_bundle(bpb)
+        j.init_app(self.app)
+
+        def get(i):
+            return self.app.test_client().get('/api/v1/bp{0}/route'.format(i)).status_code
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            statuses = list(executor.map(get, range(20)))
+
+        self.assertEqual(statuses, [200] * 20)
+        self.assertEqual(len(j.routes_simple), 20)
+
+    def test_warm_up(self):
+        """Warming up should register all pending bundles"""
+
+        bpb = BlueprintBundle('/api/v1')
+        bpb.attach_bp(self.blueprint)
+
+        j = Journey(lazy=True)
+        j.attach_bundle(bpb)
+        j.init_app(self.app)
+
+        self.assertEqual(j.routes_detailed, ())
+
+        j.warm_up(self.app)
+
+        self.assertEqual(j.routes_detailed[0]['path'], '/api/v1')
+
+    def test_startup_report(self):
+        """Startup phases should be recorded per bundle and blueprint when profiling is enabled"""
+
+        bpb = BlueprintBundle('/api/v1')
+        bpb.attach_bp(self.blueprint)
+
+        j = Journey(profile=True)
+        j.attach_bundle(bpb)
+        j.init_app(self.app)
+
+        report = j.startup_report
+        bundle = report['bundles'][0]
+        blueprint = bundle['blueprints'][0]
+
+        self.assertEqual(bundle['path'], '/api/v1')
+        self.assertTrue('attach_bundle' in bundle['phases'])
+        self.assertTrue('index_rules' in report['phases'])
+        self.assertEqual(blueprint['name'], 'test')
+        self.assertEqual(sorted(blueprint['phases']), ['get_blueprint_routes', 'index_paths', 'register_blueprint',
+                                                     'warm_schemas'])
+
+        result = self.app.test_cli_runner().invoke(args=['journey', 'startup-report'])
+        self.assertEqual(json.loads(result.output), report)
+
+    def test_startup_report_disabled(self):
+        """Startup report should be None unless profiling is enabled"""
+
+        bpb = BlueprintBundle('/api/v1')
+        bpb.attach_bp(self.blueprint)
+
+        j = Journey(self.app, bundles=[bpb])
+
+        self.assertEqual(j.startup_report, None)
+        self.assertNotEqual(self.app.test_cli_runner().invoke(args=['journey', 'startup-report']).exit_code, 0)
+
+    def test_json_backends(self):
+        """Routes should decode and encode JSON with the backend Journey was initialized with"""
+
+        class ItemSchema(Schema):
+            name = fields.String(required=True)
+
+        bp = Blueprint('items', __name__)
+
+        @route(bp, '/', methods=['POST'], _body=ItemSchema(), marshal_with=ItemSchema())
+        def create(_body):
+            return _body.data
+
+        bundle = BlueprintBundle('/api')
+        bundle.attach_bp(bp)
+
+        for name in BACKENDS:
+            try:
+                __import__(name)
+            except ImportError:
+                continue
+
+            app = Flask(__name__)
+            j = Journey(app, bundles=[bundle], json_backend=name)
+
+            response = app.test_client().post('/api/items', data=json.dumps({'name': u'\u00e5'}),
+                                              content_type='application/json')
+
+            self.assertEqual(j.json_backend.name, name)
+            self.assertEqual(json.loads(response.get_data(as_text=True)), {'name': u'\u00e5'})
+
+            response = app.test_client().post('/api/items', data='{invalid', content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+
+    def test_invalid_json_backend(self):
+        """Unknown JSON backends should raise InvalidJSONBackend"""
+
+        self.assertRaises(InvalidJSONBackend, Journey, json_backend='invalid')
+
+    def test_batch(self):
+        """Batch sub-requests should be dispatched through the bundle's routes and answered in order"""
+
+        class ItemSchema(Schema):
+            id = fields.Integer(required=True)
+
+        bp = Blueprint('items', __name__)
+
+        @route(bp, '/<int:item_id>', marshal_with=ItemSchema())
+        def get_one(item_id):
+            return {'id': item_id}
+
+        @route(bp, '/', methods=['POST'], _body=ItemSchema(), marshal_with=ItemSchema())
+        def create(_body):
+            return _body.data
+
+        for workers in (None, 2):
+            app = Flask(__name__)
+            bundle = BlueprintBundle('/api', batch=True, batch_workers=workers)
+            bundle.attach_bp(bp)
+            Journey(app, bundles=[bundle])
+
+            sub_requests = [
+                {'path': '/items/1'},
+                {'method': 'POST', 'path': '/items', 'body': {'id': 2}},
+                {'method': 'POST', 'path': '/items', 'body': {}},
+                {'path': '/../items/1'},
+            ]
+
+            response = app.test_client().post('/api/_batch', data=json.dumps(sub_requests),
+                                              content_type='application/json')
+            data = json.loads(response.get_data(as_text=True))
+
+            self.assertEqual([r['status'] for r in data], [200, 200, 422, 400])
+            self.assertEqual(data[0]['body'], {'id': 1})
+            self.assertEqual(data[1]['body'], {'id': 2})
+
+            response = app.test_client().post('/api/_batch', data=json.dumps([{'method': 'GET'}]),
+                                              content_type='application/json')
+            self.assertEqual(response.status_code, 422)
+
+    def test_bundle_compression(self):
+        """Responses of compressed bundles should be compressed, other bundles' left as is"""
+
+        bp1 = Blueprint('bp1', __name__)
+        bp2 = Blueprint('bp2', __name__)
+
+        @bp1.route('/')
+        @bp2.route('/')
+        def index():
+            return 'x' * 2000
+
+        compressed = BlueprintBundle('/compressed', compress=True)
+        compressed.attach_bp(bp1)
+        plain = BlueprintBundle('/plain')
+        plain.attach_bp(bp2)
+
+        app = Flask(__name__)
+        Journey(app, bundles=[compressed, plain])
+        client = app.test_client()
+
+        response = client.get('/compressed/bp1/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+
+        response = client.get('/plain/bp2/', headers={'Accept-Encoding': 'gzip'})
+        self.assertFalse('Content-Encoding' in response.headers)
+
+    def test_schema_registry(self):
+        """Route schemas should be collected at init_app, along with the routes sharing them"""
+
+        class ItemSchema(Schema):
+            id = fields.Integer(required=True)
+
+        item = ItemSchema()
+        bp = Blueprint('items', __name__)
+
+        @route(bp, '/<int:item_id>', marshal_with=item)
+        def get_one(item_id):
+            return {'id': item_id}
+
+        @route(bp, '/', methods=['POST'], _body=item, marshal_with=item)
+        def create(_body):
+            return _body.data
+
+        bundle = BlueprintBundle('/api')
+        bundle.attach_bp(bp)
+
+        j = Journey(self.app, bundles=[bundle], sample_schemas=True)
+
+        self.assertEqual(len(j.schemas), 1)
+        self.assertEqual([entry.schema for entry in j.schemas.shared()], [item])
+        self.assertEqual(list(j.schemas)[0].endpoints, ['items.create', 'items.get_one'])
+        self.assertEqual(j.schemas.for_endpoint('items.create'), {'body': item, 'output': item})
+
+    def test_schema_sampling_errors(self):
+        """Schemas failing on the empty samples, e.g. in hooks, should not fail init_app"""
+
+        class ItemSchema(Schema):
+            name = fields.String()
+
+            @post_load
+            def make_item(self, data):
+                return data['name']
+
+            @pre_dump
+            def check(self, obj):
+                raise RuntimeError('Unexpected object')
+
+        bp = Blueprint('items', __name__)
+
+        @route(bp, '/', methods=['POST'], _body=ItemSchema(), marshal_with=ItemSchema())
+        def create(_body):
+            return _body.data
+
+        bundle = BlueprintBundle('/api')
+        bundle.attach_bp(bp)
+
+        j = Journey(self.app, bundles=[bundle], sample_schemas=True)
+
+        self.assertEqual(len(j.schemas), 2)
+
+    def test_schema_registry_unresolvable(self):
+        """Nested schemas that can't be resolved should fail at init_app instead of on the first request"""
+
+        class ParentSchema(Schema):
+            child = fields.Nested('MissingSchema')
+
+        bp = Blueprint('items', __name__)
+
+        @route(bp, '/', marshal_with=ParentSchema())
+        def get_one():
+            return {}
+
+        bundle = BlueprintBundle('/api')
+        bundle.attach_bp(bp)
+
+        self.assertRaises(IncompatibleSchema, Journey, self.app, bundles=[bundle])
+
+    def test_resolve(self):
+        """Paths should resolve to the bundle, blueprint and endpoint serving them"""
+
+        bp = Blueprint('items', __name__)
+
+        @bp.route('/')
+        def get_many():
+            return ''
+
+        @bp.route('/<int:item_id>', methods=['GET'])
+        def get_one(item_id):
+            return ''
+
+        @bp.route('/<int:item_id>', methods=['PUT'])
+        def update(item_id):
+            return ''
+
+        @bp.route('/new')
+        def new():
+            return ''
+
+        @bp.route('/files/<path:name>')
+        def get_file(name):
+            return ''
+
+        bundle = BlueprintBundle('/api')
+        bundle.attach_bp(bp)
+
+        j = Journey(self.app, bundles=[bundle])
+
+        self.assertEqual(j.resolve('/api/items/'), ('/api', 'items', 'items.get_many', '/api/items/'))
+        self.assertEqual(j.resolve('/api/items/new').endpoint, 'items.new')
+        self.assertEqual(j.resolve('/api/items/1', 'GET').endpoint, 'items.get_one')
+        self.assertEqual(j.resolve('/api/items/1', 'PUT').endpoint, 'items.update')
+        self.assertEqual(j.resolve('/api/items/files/a/b.txt').endpoint, 'items.get_file')
+        self.assertEqual(j.resolve('/api/items/1/missing'), ('/api', 'items', None, None))
+        self.assertEqual(j.resolve('/api/other'), ('/api', None, None, None))
+        self.assertEqual(j.resolve('/other'), None)
+
+    def test_detach_bundle(self):
+        """Detached bundles should not be registered, and their path should be free again"""
+
+        self.bundle.attach_bp(self.blueprint)
+        other = BlueprintBundle('/other')
+        other.attach_bp(Blueprint('other', __name__))
+
+        j = Journey()
+        j.attach_bundle(self.bundle)
+        j.attach_bundle(other)
+
+        self.assertTrue(j.detach_bundle('/other/') is other)
+        self.assertRaises(KeyError, j.detach_bundle, '/other')
+
+        j.init_app(self.app)
+
+        self.assertEqual([bundle['path'] for bundle in j.routes_detailed], [self.bundle.path])
+
+    def test_snapshot(self):
+        """Routes should be read from a snapshot written for the same bundle definitions"""
+
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        filename = os.path.join(tmp, 'routes.snapshot')
+
+        bp = Blueprint('items', __name__)
+
+        @bp.route('/<int:item_id>')
+        def get_one(item_id):
+            return str(item_id)
+
+        bpb = BlueprintBundle('/api/v1')
+        bpb.attach_bp(bp)
+
+        j = Journey()
+        j.attach_bundle(bpb)
+        j.init_app(self.app)
+
+        result = self.app.test_cli_runner().invoke(args=['journey', 'snapshot', filename])
+        self.assertEqual(result.exit_code, 0)
+
+        # A worker with the same bundles skips route extraction
+        worker = Journey(profile=True)
+        worker.attach_bundle(bpb)
+        worker.init_app(Flask(__name__), snapshot=filename)
+
+        self.assertEqual(worker.routes_detailed, j.routes_detailed)
+        self.assertEqual(worker.resolve('/api/v1/items/1').endpoint, 'items.get_one')
+        self.assertTrue('load_snapshot' in worker.startup_report['phases'])
+        self.assertFalse('index_rules' in worker.startup_report['phases'])
+
+        # Rules changed without changing the snapshot key are caught by checking the URL map
+        moved = Blueprint('items', __name__)
+
+        @moved.route('/by-id/<int:item_id>')
+        def get_one_moved(item_id):
+            return str(item_id)
+
+        moved_bundle = BlueprintBundle('/api/v1')
+        moved_bundle.attach_bp(moved)
+
+        worker = Journey()
+        worker.attach_bundle(moved_bundle)
+        worker.init_app(Flask(__name__), snapshot=filename)
+
+        self.assertEqual(worker.plan.key, j.plan.key)
+        self.assertEqual(worker.routes_detailed[0]['blueprints'][0]['routes'][0]['path'], '/by-id/<int:item_id>')
+        self.assertEqual(worker.resolve('/api/v1/items/by-id/1').endpoint, 'items.get_one_moved')
+
+        # Changed bundle definitions invalidate the snapshot
+        other = BlueprintBundle('/api/v1')
+        other.attach_bp(bp)
+        other.attach_bp(Blueprint('other', __name__))
+
+        worker = Journey(profile=True)
+        worker.attach_bundle(other)
+        worker.init_app(Flask(__name__), snapshot=filename)
+
+        self.assertFalse(worker.plan.snapshot)
+        self.assertTrue('index_rules' in worker.startup_report['phases'])
+        self.assertEqual(len(worker.routes_detailed[0]['blueprints']), 2)
+
+    def test_snapshot_invalid(self):
+        """Missing or corrupt snapshots should be ignored"""
+
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        filename = os.path.join(tmp, 'routes.snapshot')
+
+        bpb = BlueprintBundle('/api/v1')
+        bpb.attach_bp(self.blueprint)
+
+        j = Journey()
+        j.attach_bundle(bpb)
+        j.init_app(self.app, snapshot=filename)
+
+        self.assertEqual(j.plan.snapshot, None)
+
+        with open(filename, 'wb') as f:
+            f.write(b'{"version": 1, "key"')
+
+        self.assertFalse(j.plan.load_snapshot(filename, j.json_backend.loads))
+
+        # Without a path passed to the command or init_app
+        app = Flask(__name__)
+        Journey(app, bundles=[bpb])
+        result = app.test_cli_runner().invoke(args=['journey', 'snapshot'])
+
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertTrue('No snapshot path' in result.output)
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+import gc
+import json
+import threading
+
+from unittest import TestCase
+from flask import Flask, Blueprint
+from marshmallow import Schema, fields
+
+from flask_journey import Journey, BlueprintBundle, route, create_metrics_bundle
+
+
+class QuerySchema(Schema):
+    p1 = fields.Integer(required=True)
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        app.config['TESTING'] = True
+
+        bp = Blueprint('test', __name__)
+
+        @route(bp, '/', _query=QuerySchema(), marshal_with=QuerySchema())
+        def get_one(_query):
+            return _query.data
+
+        @route(bp, '/fail')
+        def fail():
+            raise KeyError('fail')
+
+        bundle = BlueprintBundle('/api')
+        bundle.attach_bp(bp)
+
+        self.journey = Journey(metrics=True)
+        self.journey.attach_bundle(bundle)
+        self.journey.attach_bundle(create_metrics_bundle(self.journey))
+        self.journey.init_app(app)
+
+        self.app = app
+
+    def test_counts(self):
+        """Requests and validation failures should be counted per endpoint across threads"""
+
+        def worker():
+            client = self.app.test_client()
+
+            for _ in range(10):
+                client.get('/api/test?p1=1')
+                client.get('/api/test?p1=invalid')
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+
+        for t in threads:
+            t.start()
+
+        for t in threads:
+            t.join()
+
+        stats = self.journey.metrics.snapshot()['test.get_one']
+
+        self.assertEqual(stats['requests'], 80)
+        self.assertEqual(stats['validation_failures'], 40)
+        self.assertEqual(stats['phases']['query']['count'], 40)
+        self.assertEqual(stats['phases']['handler']['count'], 40)
+        self.assertEqual(stats['phases']['serialize']['buckets'][-1][1], 40)
+        self.assertEqual(stats['phases']['body']['count'], 0)
+
+    def test_prometheus(self):
+        """The metrics bundle should expose the metrics in the Prometheus text format"""
+
+        client = self.app.test_client()
+        self.assertEqual(json.loads(client.get('/api/test?p1=1').get_data(as_text=True)), {'p1': 1})
+
+        text = client.get('/_journey/metrics').get_data(as_text=True)
+
+        self.assertTrue('journey_requests_total{endpoint="test.get_one"} 1' in text)
+        self.assertTrue('journey_phase_seconds_bucket{endpoint="test.get_one",phase="handler",le="+Inf"} 1' in text)
+        self.assertTrue('journey_phase_seconds_count{endpoint="test.get_one",phase="query"} 1' in text)
+
+    def test_thread_shards_reaped(self):
+        """Counters of exited threads should be merged instead of kept per thread"""
+
+        def worker():
+            self.app.test_client().get('/api/test?p1=1')
+
+        for _ in range(50):
+            t = threading.Thread(target=worker)
+            t.start()
+            t.join()
+
+        gc.collect()
+
+        self.assertEqual(len(self.journey.metrics._shards), 0)
+        self.assertEqual(self.journey.metrics.snapshot()['test.get_one']['requests'], 50)
+
+    def test_failed_requests_counted(self):
+        """Requests whose view raises should be counted"""
+
+        # Let the error become a 500 response rather than propagate to the test
+        self.app.testing = False
+        self.app.logger.disabled = True
+        client = self.app.test_client()
+
+        self.assertEqual(client.get('/api/test/fail').status_code, 500)
+        self.assertEqual(client.get('/api/test/fail').status_code, 500)
+        self.assertEqual(self.journey.metrics.snapshot()['test.fail']['requests'], 2)
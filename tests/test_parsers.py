@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+import io
+import json
+
+from unittest import TestCase
+from flask_journey.parsers import iter_json_array, iter_ndjson
+
+
+class TestParsers(TestCase):
+    def test_json_array(self):
+        """Array elements should be decoded correctly regardless of where chunks end"""
+
+        items = [1, 23456, -1.5e3, 'a "quoted", [string]', u'é中', None, True, {'a': [1, {'b': 2}]}, []]
+        data = json.dumps(items, ensure_ascii=False).encode('utf-8')
+
+        for chunk_size in (1, 2, 3, 7, len(data)):
+            self.assertEqual(list(iter_json_array(io.BytesIO(data), chunk_size)), items)
+
+    def test_json_array_empty(self):
+        self.assertEqual(list(iter_json_array(io.BytesIO(b' [ ] '))), [])
+
+    def test_json_array_invalid(self):
+        for data in (b'', b'{}', b'[1, 2', b'[1 2]', b'[1,]', b'[1] 2'):
+            self.assertRaises(ValueError, list, iter_json_array(io.BytesIO(data), 1))
+
+    def test_ndjson(self):
+        data = b'{"a": 1}\n\n[2]\n3'
+        self.assertEqual(list(iter_ndjson(io.BytesIO(data), json.loads)), [{'a': 1}, [2], 3])
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+import re
+
+from unittest import TestCase
+from flask_journey import InvalidPath
+from flask_journey.paths import sanitize_path, join_paths, is_canonical
+
+
+def reference_sanitize(path):
+    if path == '/':
+        return path
+
+    return re.sub(r'/+', '/', path).rstrip('/')
+
+
+class PathsTestCase(TestCase):
+    def test_sanitize(self):
+        """The fast path and the normalizing path should produce the same results as the regex normalizer"""
+
+        for path in ('/', '//', '/a', '/a/', '/a//b', '///a///b///', '/a/b/c', '/<int:id>'):
+            self.assertEqual(sanitize_path(path), reference_sanitize(path))
+
+        self.assertTrue(is_canonical('/a/b'))
+        self.assertFalse(is_canonical('/a/b/'))
+        self.assertFalse(is_canonical('/a//b'))
+
+    def test_sanitize_invalid(self):
+        self.assertRaises(InvalidPath, sanitize_path, '')
+        self.assertRaises(InvalidPath, sanitize_path, 'a/b')
+
+    def test_join(self):
+        """Joined paths should be sanitized and interned"""
+
+        self.assertEqual(join_paths('', '/api/', '/v1//'), '/api/v1')
+        self.assertTrue(join_paths('/api', '/v1') is sanitize_path('/api' + '/v1/'))
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from unittest import TestCase
+from concurrent.futures import ProcessPoolExecutor
+from flask import Flask, Blueprint
+from marshmallow import Schema, fields, validate
+
+from flask_journey import Journey, BlueprintBundle, IncompatibleSchema, route
+
+
+class ItemSchema(Schema):
+    id = fields.Integer(required=True, validate=validate.Range(min=1))
+    name = fields.String(required=True)
+
+
+class BodyPoolTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ProcessPoolExecutor(max_workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.config['TESTING'] = True
+
+        bp = Blueprint('items', __name__)
+
+        @route(bp, '/', methods=['POST'], _body=ItemSchema(many=True), marshal_with=ItemSchema(many=True),
+               body_pool_threshold=64)
+        def create(_body):
+            return _body.data
+
+        bundle = BlueprintBundle('/api')
+        bundle.attach_bp(bp)
+        Journey(app, bundles=[bundle], body_pool=self.pool)
+
+        self.client = app.test_client()
+
+    def post(self, payload):
+        response = self.client.post('/api/items', data=payload, content_type='application/json')
+        return response.status_code, json.loads(response.get_data(as_text=True))
+
+    def test_large_body(self):
+        """Bodies over the threshold should be loaded in the pool with the same outcome"""
+
+        items = [{'id': i, 'name': 'item{0}'.format(i)} for i in range(1, 20)]
+
+        self.assertEqual(self.post(json.dumps(items)), (200, items))
+
+        items[3]['id'] = 0
+        status, errors = self.post(json.dumps(items))
+
+        self.assertEqual(status, 422)
+        self.assertEqual(list(errors), ['3'])
+
+    def test_small_body(self):
+        """Bodies under the threshold should be loaded in-process"""
+
+        self.assertEqual(self.post(json.dumps([{'id': 1, 'name': 'a'}])), (200, [{'id': 1, 'name': 'a'}]))
+
+    def test_invalid_json(self):
+        """Invalid JSON over the threshold should return 400"""
+
+        response = self.client.post('/api/items', data='[' * 100, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_unpicklable_schema(self):
+        """Schemas that can't be pickled should raise IncompatibleSchema"""
+
+        class LocalSchema(Schema):
+            id = fields.Integer()
+
+        bp = Blueprint('test', __name__)
+        self.assertRaises(IncompatibleSchema, route, bp, '/', _body=LocalSchema(), body_pool_threshold=0)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+from flask import Flask, Blueprint
+from flask_journey import Journey, BlueprintBundle
+from flask_journey.records import RouteRecord, BlueprintRecord, BundleRecord, shared_methods
+
+
+class RecordsTestCase(TestCase):
+    def setUp(self):
+        self.route = RouteRecord.create('/items', 'items.get_many', ['GET', 'HEAD'])
+        self.blueprint = BlueprintRecord('items', '/items', __name__, 'Items', (self.route, ))
+        self.bundle = BundleRecord('/api', 'API', (self.blueprint, ))
+
+    def test_shared_methods(self):
+        """Routes allowing the same methods should share one frozenset"""
+
+        other = RouteRecord.create('/other', 'items.other', ('HEAD', 'GET'))
+
+        self.assertEqual(self.route.methods, frozenset(['GET', 'HEAD']))
+        self.assertTrue(other.methods is self.route.methods)
+        self.assertTrue(shared_methods(['GET', 'HEAD']) is self.route.methods)
+
+    def test_as_dict(self):
+        """as_dict should return the nested dicts and lists Journey used to build"""
+
+        data = self.bundle.as_dict()
+
+        self.assertEqual(data['path'], '/api')
+        self.assertEqual(data['blueprints'][0]['name'], 'items')
+        self.assertEqual(sorted(data['blueprints'][0]['routes'][0]['methods']), ['GET', 'HEAD'])
+        self.assertTrue(isinstance(data['blueprints'], list))
+
+    def test_journey_records(self):
+        """Journey should keep route listings as records sharing method sets"""
+
+        bp1 = Blueprint('bp1', __name__)
+        bp2 = Blueprint('bp2', __name__)
+
+        for bp in (bp1, bp2):
+            bp.add_url_rule('/route', 'route', lambda: '')
+
+        bundle = BlueprintBundle('/api')
+        bundle.attach_bp(bp1)
+        bundle.attach_bp(bp2)
+
+        app = Flask(__name__)
+        j = Journey(app, bundles=[bundle])
+        registered = app.extensions['journey_state'].registered_bundles[0]
+        first, second = registered.blueprints
+
+        self.assertTrue(isinstance(registered, BundleRecord))
+        self.assertEqual(j.routes_detailed[0], registered.as_dict())
+        self.assertTrue(first.routes[0].methods is second.routes[0].methods)
+        self.assertTrue(j.routes_simple[0][2] is j.routes_simple[1][2])
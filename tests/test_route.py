@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 
+import gzip
 import json
 
 from unittest import TestCase
-from flask import Flask, Blueprint
-from flask_journey import route, IncompatibleSchema
+from flask import Flask, Blueprint, current_app
+from flask_journey import route, invalidate_cache, IncompatibleSchema, Compression
 from marshmallow import Schema, fields, validate
 
 
@@ -13,6 +14,11 @@ class QuerySchema(Schema):
     p2 = fields.Integer(required=False)
 
 
+class MultiQuerySchema(Schema):
+    tags = fields.List(fields.String(), required=True)
+    page = fields.Integer(required=False)
+
+
 class BodySchema(Schema):
     p1 = fields.Integer(required=True)
     p2 = fields.String(required=True)
@@ -63,6 +69,24 @@ class FlaskTestCase(TestCase):
 
         self.assertEqual(data, expected_output)
 
+    def test_query_multi_value(self):
+        """Keys of `fields.List` query fields should receive all values, other keys the first one"""
+
+        app = self.app
+        bp = Blueprint('test', __name__)
+
+        @route(bp, '/test', _query=MultiQuerySchema())
+        def get_with_query(**kwargs):
+            return json.dumps(kwargs['_query'].data)
+
+        app.register_blueprint(bp)
+
+        for _ in range(2):  # Second pass is served from the decoder cache
+            response = self.client.get('/test?tags=a&tags=b&page=2&page=3')
+            data = json.loads(response.get_data(as_text=True))
+
+            self.assertEqual(data, {'tags': ['a', 'b'], 'page': 2})
+
     def test_query_missing_required(self):
         """Required keys missing in query should cause validation to fail"""
 
@@ -186,6 +210,78 @@ class FlaskTestCase(TestCase):
         self.assertTrue(response_contains_p1)
         self.assertTrue(response_contains_p2)
 
+    def test_stream(self):
+        """Streamed many=True output should be a complete JSON array"""
+
+        app = self.app
+        bp = Blueprint('test', __name__)
+
+        def generate(count):
+            for i in range(count):
+                yield {'id': i, 'name': 'test{0}'.format(i)}
+
+        @route(bp, '/test', _query=QuerySchema(), marshal_with=OutputSchema(many=True), stream=True)
+        def get_many(_query):
+            return generate(_query.data['p1'])
+
+        app.register_blueprint(bp)
+
+        response = self.client.get('/test?p1=3')
+        data = json.loads(response.get_data(as_text=True))
+
+        self.assertFalse('Content-Length' in response.headers)
+        self.assertEqual(data, [{'id': i, 'name': 'test{0}'.format(i)} for i in range(3)])
+
+        # Validation happens before streaming starts
+        response = self.client.get('/test?p1=1')
+        self.assertEqual(response.status_code, 422)
+
+    def test_stream_incompatible_schema(self):
+        """Streaming without a many=True marshal_with schema should raise IncompatibleSchema"""
+
+        bp = Blueprint('test', __name__)
+
+        self.assertRaises(IncompatibleSchema, route, bp, '/test', stream=True)
+        self.assertRaises(IncompatibleSchema, route, bp, '/test', marshal_with=OutputSchema(), stream=True)
+
+    def test_stream_body(self):
+        """Streamed bodies should be passed to the view as a generator of loaded items"""
+
+        app = self.app
+        bp = Blueprint('test', __name__)
+
+        @route(bp, '/test', methods=['POST'], _body=BodySchema(many=True), stream_body=True)
+        def post_many(_body):
+            return json.dumps([item.data for item in _body])
+
+        app.register_blueprint(bp)
+
+        items = [{'p1': i, 'p2': 'test{0}'.format(i)} for i in range(3)]
+
+        response = self.client.post('/test', data=json.dumps(items), content_type='application/json')
+        self.assertEqual(json.loads(response.get_data(as_text=True)), items)
+
+        ndjson = '\n'.join(json.dumps(item) for item in items)
+        response = self.client.post('/test', data=ndjson, content_type='application/x-ndjson')
+        self.assertEqual(json.loads(response.get_data(as_text=True)), items)
+
+        # Errors are keyed by the index of the failing item
+        items[1] = {'p1': 1}
+        response = self.client.post('/test', data=json.dumps(items), content_type='application/json')
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(list(json.loads(response.get_data(as_text=True))), ['1'])
+
+        response = self.client.post('/test', data='[{"p1": 1,', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_stream_body_incompatible_schema(self):
+        """Body streaming without a many=True _body schema should raise IncompatibleSchema"""
+
+        bp = Blueprint('test', __name__)
+
+        self.assertRaises(IncompatibleSchema, route, bp, '/test', stream_body=True)
+        self.assertRaises(IncompatibleSchema, route, bp, '/test', _body=BodySchema(), stream_body=True)
+
     def test_invalid_body_schema(self):
         """Passing an non-compatible schema in _body should raise IncompatibleSchema"""
 
@@ -209,3 +305,238 @@ class FlaskTestCase(TestCase):
         kwargs = {'marshal_with': dict()}
 
         self.assertRaises(IncompatibleSchema, route, bp, '/test', **kwargs)
+
+    def test_cache(self):
+        """Cached GET responses should be served without calling the view until invalidated"""
+
+        app = self.app
+        bp = Blueprint('test', __name__)
+        calls = []
+
+        @route(bp, '/test/<int:item_id>', _query=QuerySchema(), marshal_with=OutputSchema(), cache=True)
+        def get_one(item_id, _query):
+            calls.append(item_id)
+            return {'id': item_id, 'name': 'test{0}'.format(len(calls))}
+
+        app.register_blueprint(bp)
+
+        first = self.client.get('/test/1?p1=2').get_data()
+        self.assertEqual(self.client.get('/test/1?p1=2').get_data(), first)
+        self.assertEqual(calls, [1])
+
+        # View args and query data are part of the key
+        self.client.get('/test/2?p1=2')
+        self.client.get('/test/1?p1=3')
+        self.assertEqual(calls, [1, 2, 1])
+
+        with app.test_request_context():
+            invalidate_cache('test.get_one', item_id=1)
+
+        self.client.get('/test/1?p1=2')
+        self.client.get('/test/2?p1=2')
+        self.assertEqual(calls, [1, 2, 1, 1])
+
+        with app.test_request_context():
+            invalidate_cache('test.get_one')
+
+        self.client.get('/test/2?p1=2')
+        self.assertEqual(calls, [1, 2, 1, 1, 2])
+
+    def test_cache_backend(self):
+        """Routes should cache in the backend passed as cache, even while it's empty"""
+
+        from flask_journey import LocalCache
+
+        bp = Blueprint('test', __name__)
+        backend = LocalCache()
+        calls = []
+
+        @route(bp, '/test', marshal_with=OutputSchema(), cache=backend)
+        def get_many():
+            calls.append(1)
+            return {'id': 1, 'name': 'test{0}'.format(len(calls))}
+
+        self.app.register_blueprint(bp)
+
+        first = self.client.get('/test').get_data()
+        self.assertEqual(self.client.get('/test').get_data(), first)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(len(backend) > 0)
+
+        with self.app.test_request_context():
+            invalidate_cache('test.get_many')
+
+        self.assertNotEqual(self.client.get('/test').get_data(), first)
+        self.assertEqual(len(calls), 2)
+
+        self.assertRaises(IncompatibleSchema, route, bp, '/other', cache=LocalCache())
+
+    def test_cache_per_app(self):
+        """Apps sharing a cached route should not be served each other's responses"""
+
+        from flask_journey import LocalCache
+
+        bp = Blueprint('test', __name__)
+
+        @route(bp, '/test', marshal_with=OutputSchema(), cache=True)
+        def get_default():
+            return {'id': 1, 'name': current_app.config['NAME']}
+
+        @route(bp, '/shared', marshal_with=OutputSchema(), cache=LocalCache())
+        def get_shared():
+            return {'id': 1, 'name': current_app.config['NAME']}
+
+        apps = []
+
+        for name in ('first', 'second'):
+            app = Flask(__name__)
+            app.config['NAME'] = name
+            app.config['JOURNEY_CACHE_NAMESPACE'] = name
+            app.register_blueprint(bp)
+            apps.append(app)
+
+        for app in apps + apps:
+            for path in ('/test', '/shared'):
+                body = json.loads(app.test_client().get(path).get_data(as_text=True))
+                self.assertEqual(body['name'], app.config['NAME'])
+
+    def test_cache_incompatible_schema(self):
+        """Caching without a marshal_with schema, or with streaming, should raise IncompatibleSchema"""
+
+        bp = Blueprint('test', __name__)
+
+        self.assertRaises(IncompatibleSchema, route, bp, '/test', cache=True)
+        self.assertRaises(IncompatibleSchema, route, bp, '/test', marshal_with=OutputSchema(many=True),
+                          stream=True, cache=True)
+
+    def test_etag(self):
+        """Responses should carry a content hash ETag, matching If-None-Match requests should get a 304"""
+
+        app = self.app
+        bp = Blueprint('test', __name__)
+
+        @route(bp, '/test', marshal_with=OutputSchema(), etag=True)
+        def get_one():
+            return {'id': 1, 'name': 'test'}
+
+        app.register_blueprint(bp)
+
+        response = self.client.get('/test')
+        etag = response.headers['ETag']
+
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get('/test', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+
+        response = self.client.get('/test', headers={'If-None-Match': '"other"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_version(self):
+        """Matching version tokens should skip the view"""
+
+        app = self.app
+        bp = Blueprint('test', __name__)
+        calls = []
+
+        @route(bp, '/test/<int:item_id>', marshal_with=OutputSchema(), etag=lambda item_id: 'v{0}'.format(item_id))
+        def get_one(item_id):
+            calls.append(item_id)
+            return {'id': item_id, 'name': 'test'}
+
+        app.register_blueprint(bp)
+
+        response = self.client.get('/test/1')
+        self.assertEqual(response.headers['ETag'], '"v1"')
+
+        response = self.client.get('/test/1', headers={'If-None-Match': '"v1"'})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(calls, [1])
+
+    def test_etag_compress(self):
+        """304 responses of compressing routes should carry the same validator as the 200"""
+
+        app = self.app
+        bp = Blueprint('test', __name__)
+
+        @route(bp, '/hash', marshal_with=OutputSchema(many=True), etag=True, compress=Compression(min_size=100))
+        def get_hashed():
+            return [{'id': i, 'name': 'test'} for i in range(100)]
+
+        @route(bp, '/version', marshal_with=OutputSchema(), etag=lambda: 'v1', compress=True)
+        def get_versioned():
+            return {'id': 1, 'name': 'test'}
+
+        app.register_blueprint(bp)
+
+        for path in ('/hash', '/version'):
+            response = self.client.get(path, headers={'Accept-Encoding': 'gzip'})
+            etag = response.headers['ETag']
+            self.assertTrue(etag.startswith('W/'))
+
+            response = self.client.get(path, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.headers['ETag'], etag)
+
+    def test_compress(self):
+        """Large responses should be compressed with a content coding accepted by the client"""
+
+        app = self.app
+        bp = Blueprint('test', __name__)
+        calls = []
+
+        @route(bp, '/test', marshal_with=OutputSchema(many=True), compress=Compression(min_size=100), cache=True)
+        def get_many():
+            calls.append(1)
+            return [{'id': i, 'name': 'test'} for i in range(100)]
+
+        app.register_blueprint(bp)
+
+        plain = self.client.get('/test')
+        self.assertFalse('Content-Encoding' in plain.headers)
+        self.assertEqual(plain.headers['Vary'], 'Accept-Encoding')
+
+        for _ in range(2):
+            response = self.client.get('/test', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+            self.assertEqual(gzip.decompress(response.get_data()), plain.get_data())
+
+        self.assertEqual(len(calls), 1)
+
+    def test_app_json_provider(self):
+        """Without a JSON backend chosen, responses should be encoded by the app's JSON provider"""
+
+        from flask.json.provider import DefaultJSONProvider
+
+        class Money(object):
+            def __init__(self, cents):
+                self.cents = cents
+
+        class Provider(DefaultJSONProvider):
+            sort_keys = True
+            mimetype = 'application/vnd.test+json'
+
+            @staticmethod
+            def default(o):
+                if isinstance(o, Money):
+                    return '{0:.2f}'.format(o.cents / 100.0)
+
+                return DefaultJSONProvider.default(o)
+
+        self.app.json = Provider(self.app)
+        bp = Blueprint('test', __name__)
+
+        @route(bp, '/test')
+        def get_price():
+            return {'price': Money(150), 'currency': 'EUR'}
+
+        self.app.register_blueprint(bp)
+        response = self.client.get('/test')
+
+        self.assertEqual(response.mimetype, 'application/vnd.test+json')
+        self.assertEqual(json.loads(response.get_data(as_text=True)), {'currency': 'EUR', 'price': '1.50'})
+
+        # Keys sorted by the provider
+        body = response.get_data(as_text=True)
+        self.assertTrue(body.index('currency') < body.index('price'))
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+from unittest import TestCase
+from marshmallow import Schema, fields, post_dump
+
+from flask_journey.serializers import compile_serializer
+
+
+class PilotSchema(Schema):
+    name = fields.String()
+
+
+class PlaneSchema(Schema):
+    id = fields.Integer(required=True)
+    wings = fields.Integer(dump_to='wing_count')
+    weight = fields.Float()
+    name = fields.String()
+    model = fields.String(attribute='meta.model')
+    built = fields.DateTime()
+    pilot = fields.Nested(PilotSchema)
+    tags = fields.List(fields.String())
+    active = fields.Boolean(default=True)
+    secret = fields.String(load_only=True)
+    extra = fields.Raw()
+
+
+class ProcessedSchema(Schema):
+    id = fields.Integer()
+
+    @post_dump
+    def add_flag(self, data):
+        data['processed'] = True
+        return data
+
+
+class Plane(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+planes = [
+    {'id': 1, 'wings': 2, 'weight': 10, 'name': 'a', 'meta': {'model': 'x'}, 'built': datetime.datetime(2018, 1, 1),
+     'pilot': {'name': 'p'}, 'tags': ['t1', 't2'], 'secret': 's', 'extra': [1, 2]},
+    {'id': '2', 'name': None, 'active': False},
+    Plane(id=3, wings=4, name=u'obj', tags=[]),
+]
+
+
+class CompiledSerializerTestCase(TestCase):
+    def test_identical_output(self):
+        """Compiled serializers should produce the same output as Schema.dump"""
+
+        for schema in (PlaneSchema(), PlaneSchema(only=('id', 'name')), ProcessedSchema()):
+            serialize = compile_serializer(schema)
+            for plane in planes:
+                self.assertEqual(serialize(plane), schema.dump(plane).data)
+
+    def test_identical_output_many(self):
+        """Compiled serializers for many=True schemas should serialize lists and generators like Schema.dump"""
+
+        schema = PlaneSchema(many=True)
+        serialize = compile_serializer(schema)
+
+        self.assertEqual(serialize(planes), schema.dump(planes).data)
+        self.assertEqual(serialize(p for p in planes), schema.dump(planes).data)
+        self.assertEqual(serialize([]), [])
+
+    def test_fallback_on_error(self):
+        """Values the fast path can't handle should fall back to Schema.dump"""
+
+        schema = PlaneSchema(many=True)
+        serialize = compile_serializer(schema)
+        invalid = [{'id': 'not-a-number'}]
+
+        self.assertEqual(serialize(invalid), schema.dump(invalid).data)